@@ -6,77 +6,85 @@ Quick test to verify config file read/write
 
 import configparser
 import os
+import sys
 
 config_file = 'mariadb_backup.conf'
 
-print("Testing config file operations...")
-print(f"Config file: {config_file}")
-print()
+REQUIRED_FIELDS = {
+    'mysql': ('host', 'user', 'password', 'port'),
+    'backup_paths': ('hourly', 'daily', 'monthly'),
+    'options': ('compression',),
+    'webhooks': ('success_url', 'failure_url'),
+}
 
-# Test 1: Check if file exists
-if os.path.exists(config_file):
-    print(f"✓ Config file exists")
-    
-    # Test 2: Read the file
-    config = configparser.ConfigParser()
-    config.read(config_file)
+# Collect output and emit it with a single write at the end
+out = []
+
+out.append("Testing config file operations...")
+out.append(f"Config file: {config_file}")
+out.append("")
+
+# Test 1 & 2: Read the file (configparser skips files it cannot open)
+config = configparser.ConfigParser()
+loaded = config.read(config_file)
+
+if loaded:
+    out.append(f"✓ Config file exists")
+    out.append(f"✓ Config file loaded")
+    out.append("")
     
-    print(f"✓ Config file loaded")
-    print()
+    # Snapshot every section into plain dicts so lookups below skip
+    # configparser's proxy/interpolation machinery
+    snap = {section: dict(config.items(section, raw=True)) for section in config.sections()}
     
     # Test 3: Display sections
-    print("Sections found:")
-    for section in config.sections():
-        print(f"  [{section}]")
-        for key, value in config.items(section):
+    out.append("Sections found:")
+    for section, values in snap.items():
+        out.append(f"  [{section}]")
+        for key, value in values.items():
             if key == 'password' and value:
-                print(f"    {key} = {'*' * len(value)}")
+                out.append(f"    {key} = ***")
             else:
-                print(f"    {key} = {value}")
-        print()
+                out.append(f"    {key} = {value}")
+        out.append("")
     
     # Test 4: Check required fields
-    print("Required fields check:")
-    required = {
-        'mysql': ['host', 'user', 'password', 'port'],
-        'backup_paths': ['hourly', 'daily', 'monthly'],
-        'options': ['compression'],
-        'webhooks': ['success_url', 'failure_url'],
-    }
-    
+    out.append("Required fields check:")
     all_good = True
-    for section, keys in required.items():
-        if not config.has_section(section):
-            print(f"  ✗ Missing section: [{section}]")
+    for section, keys in REQUIRED_FIELDS.items():
+        if section not in snap:
+            out.append(f"  ✗ Missing section: [{section}]")
             all_good = False
         else:
             for key in keys:
-                if not config.has_option(section, key):
-                    print(f"  ✗ Missing key: {section}.{key}")
+                if key not in snap[section]:
+                    out.append(f"  ✗ Missing key: {section}.{key}")
                     all_good = False
                 else:
-                    value = config.get(section, key)
+                    value = snap[section][key]
                     if key == 'password':
                         status = "set" if value else "empty"
-                        print(f"  ✓ {section}.{key} = {status}")
+                        out.append(f"  ✓ {section}.{key} = {status}")
                     else:
-                        print(f"  ✓ {section}.{key} = {value}")
+                        out.append(f"  ✓ {section}.{key} = {value}")
     
     if all_good:
-        print("\n✓ All required fields present")
+        out.append("\n✓ All required fields present")
     else:
-        print("\n✗ Some fields missing")
+        out.append("\n✗ Some fields missing")
     
     # Test 5: Check file permissions
-    mode = oct(os.stat(config_file).st_mode)[-3:]
-    print(f"\nFile permissions: {mode}")
-    if mode == '600':
-        print("✓ Permissions are secure (600)")
+    perm = os.stat(config_file).st_mode & 0o777
+    out.append(f"\nFile permissions: {perm:03o}")
+    if perm == 0o600:
+        out.append("✓ Permissions are secure (600)")
     else:
-        print(f"⚠ Warning: Permissions should be 600, not {mode}")
-        print("  Fix with: chmod 600 mariadb_backup.conf")
+        out.append(f"⚠ Warning: Permissions should be 600, not {perm:03o}")
+        out.append("  Fix with: chmod 600 mariadb_backup.conf")
     
 else:
-    print(f"✗ Config file not found: {config_file}")
-    print("  Run ./mariadb_manager.py first to create it")
-    print("  Or copy from example: cp mariadb_backup.conf.example mariadb_backup.conf")
+    out.append(f"✗ Config file not found: {config_file}")
+    out.append("  Run ./mariadb_manager.py first to create it")
+    out.append("  Or copy from example: cp mariadb_backup.conf.example mariadb_backup.conf")
+
+sys.stdout.write("\n".join(out) + "\n")
@@ -4,9 +4,17 @@
 Debug utility to check config file status
 """
 
+import datetime
 import os
 import sys
-import configparser
+
+cwd = os.getcwd()
+
+
+def absolute(loc):
+    """Resolve loc against the cached working directory"""
+    return loc if os.path.isabs(loc) else os.path.normpath(os.path.join(cwd, loc))
+
 
 # Check common locations
 config_locations = [
@@ -15,47 +23,67 @@ config_locations = [
     os.path.expanduser('~/.config/mariadb_backup.conf'),
 ]
 
-print("MariaDB Backup Config File Checker")
-print("=" * 60)
+
+def stat_locations(locations):
+    """Stat each location once. Missing or unreadable files map to None."""
+    results = {}
+    for loc in locations:
+        try:
+            results[loc] = os.stat(loc)
+        except OSError:
+            results[loc] = None
+    return results
+
+
+# Collect output and emit it with a single write at the end
+out = []
+
+out.append("MariaDB Backup Config File Checker")
+out.append("=" * 60)
+
+stats = stat_locations(config_locations)
 
 for loc in config_locations:
-    abs_loc = os.path.abspath(loc)
-    print(f"\nChecking: {abs_loc}")
+    abs_loc = absolute(loc)
+    out.append(f"\nChecking: {abs_loc}")
     
-    if os.path.exists(loc):
-        print(f"  ✓ EXISTS")
-        
-        # Check permissions
-        stat_info = os.stat(loc)
-        mode = oct(stat_info.st_mode)[-3:]
-        print(f"  Permissions: {mode}")
-        
-        # Check size
-        size = os.path.getsize(loc)
-        print(f"  Size: {size} bytes")
-        
-        # Check modification time
-        import datetime
-        mtime = datetime.datetime.fromtimestamp(stat_info.st_mtime)
-        print(f"  Modified: {mtime}")
+    stat_info = stats[loc]
+    if stat_info is None:
+        out.append(f"  ✗ NOT FOUND")
+        continue
+
+    out.append(f"  ✓ EXISTS")
+    
+    # Check permissions
+    perm = stat_info.st_mode & 0o777
+    out.append(f"  Permissions: {perm:03o}")
+    
+    # Check size
+    out.append(f"  Size: {stat_info.st_size} bytes")
+    
+    # Check modification time
+    mtime = datetime.datetime.fromtimestamp(stat_info.st_mtime)
+    out.append(f"  Modified: {mtime}")
+    
+    # Try to read it
+    try:
+        # Imported lazily: only needed once a config file actually exists
+        import configparser
+        config = configparser.ConfigParser()
+        config.read(loc)
+        out.append(f"  Sections: {', '.join(config.sections())}")
         
-        # Try to read it
-        try:
-            config = configparser.ConfigParser()
-            config.read(loc)
-            print(f"  Sections: {', '.join(config.sections())}")
-            
-            if config.has_section('mysql'):
-                print(f"  MySQL user: {config.get('mysql', 'user', fallback='(not set)')}")
-                print(f"  MySQL host: {config.get('mysql', 'host', fallback='(not set)')}")
-                pwd = config.get('mysql', 'password', fallback='')
-                print(f"  MySQL password: {'set (' + str(len(pwd)) + ' chars)' if pwd else '(empty)'}")
-        except Exception as e:
-            print(f"  ERROR reading: {e}")
-    else:
-        print(f"  ✗ NOT FOUND")
-
-print("\n" + "=" * 60)
-print("\nCurrent working directory:", os.getcwd())
-print("\nIf you run mariadb_manager.py with no arguments,")
-print("it will use: " + os.path.abspath('mariadb_backup.conf'))
+        if config.has_section('mysql'):
+            out.append(f"  MySQL user: {config.get('mysql', 'user', fallback='(not set)')}")
+            out.append(f"  MySQL host: {config.get('mysql', 'host', fallback='(not set)')}")
+            pwd = config.get('mysql', 'password', fallback='')
+            out.append(f"  MySQL password: {'set (' + str(len(pwd)) + ' chars)' if pwd else '(empty)'}")
+    except Exception as e:
+        out.append(f"  ERROR reading: {e}")
+
+out.append("\n" + "=" * 60)
+out.append(f"\nCurrent working directory: {cwd}")
+out.append("\nIf you run mariadb_manager.py with no arguments,")
+out.append("it will use: " + absolute('mariadb_backup.conf'))
+
+sys.stdout.write("\n".join(out) + "\n")
@@ -6,43 +6,202 @@ Comprehensive solution for backing up and restoring MariaDB databases
 with support for master/slave replication configuration.
 """
 
-import argparse
+import collections
+import concurrent.futures
 import configparser
+import copy
 import datetime
-import getpass
+import errno
+import gzip
+import hashlib
+import io
 import json
 import os
+import re
 import shutil
 import subprocess
 import sys
 import tempfile
-import urllib.error
-import urllib.request
+import threading
+
+# Optional: lets .zst backups be restored on hosts without the zstd binary
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Optional: runs the replication setup over one driver connection. Loaded
+# by _import_pymysql() on first use, since only slave restores need it
+pymysql = None
+
+
+def _import_pymysql():
+    """Import pymysql on first use; returns None if it is not installed"""
+    global pymysql
+    if pymysql is None:
+        try:
+            import pymysql as module
+        except ImportError:
+            return None
+        pymysql = module
+    return pymysql
+
+
+# Config search order; the home directory is resolved once at import
+CONFIG_LOCATIONS = (
+    '/etc/mariadb_backup.conf',
+    os.path.expanduser('~/.config/mariadb_backup.conf'),
+    'mariadb_backup.conf',  # Current directory (last resort)
+)
+
+# Parsed configs keyed on (absolute path, mtime_ns, size) so re-instantiating the
+# manager in the same process skips re-reading an unchanged file
+_CONFIG_CACHE = {}
+
+# Crontab lines that belong to this tool (entries and their comments)
+_MDB_CRON_RE = re.compile(r"mariadb_manager\.py|MariaDB")
+
+# Binlog coordinates in a mysqldump --master-data=2 header
+_CHANGE_MASTER_RE = re.compile(
+    rb"^-- CHANGE MASTER TO MASTER_LOG_FILE='([^']+)', MASTER_LOG_POS=(\d+)"
+)
+
+# One scheduled backup run in the crontab
+_CRON_LINE = "{sched} {script} --backup {kind} --config {cfg} >> /var/log/mariadb_backup.log 2>&1"
+
+
+def _ask(prompt, default=None):
+    """Prompt for a value, showing default in brackets when there is one
+
+    Returns:
+        The stripped answer, else default, else None
+    """
+    suffix = f" [{default}]: " if default else ": "
+    return input(prompt + suffix).strip() or default or None
+
+
+def _ask_secret(prompt):
+    """Prompt for a password without echo; None when left empty"""
+    import getpass
+
+    return getpass.getpass(prompt + ": ") or None
+
 
 
 class MariaDBManager:
+    # Separates per-account output when user grants are fetched in one batch
+    USER_MARKER = "###MARIADB_BACKUP_USER###"
+    # Terminates each query's output on the shared mysql session
+    END_MARKER = "###MARIADB_BACKUP_END###"
+    # Seconds a query on the shared mysql session may take before the
+    # client is killed
+    MYSQL_QUERY_TIMEOUT = 600
+    # Where a local server's Unix socket usually lives
+    SOCKET_LOCATIONS = (
+        '/var/run/mysqld/mysqld.sock',
+        '/var/lib/mysql/mysql.sock',
+        '/tmp/mysql.sock',
+        '/run/mysqld/mysqld.sock',
+    )
+    # A same-period backup completed less than this many seconds ago is
+    # not overwritten
+    RECENT_BACKUP_SECONDS = 300
+    # Backup file suffixes in restore preference order
+    BACKUP_SUFFIXES = (".zst", ".lz4", ".gz", "")
+    # Server schemas left out of per-database dumps; accounts are backed
+    # up separately in users_and_grants.sql
+    SYSTEM_SCHEMAS = frozenset(("information_schema", "performance_schema", "sys", "mysql"))
+    # Per-backup checksum list, written when [options] checksums = yes
+    CHECKSUM_FILE = "SHA256SUMS"
+    # Leading bytes of each compressed format; restore trusts these over
+    # the file name
+    COMPRESSION_MAGIC = {
+        "gzip": b"\x1f\x8b",
+        "zstd": b"\x28\xb5\x2f\xfd",
+        "lz4": b"\x04\x22\x4d\x18",
+    }
+
     def __init__(self, config_file=None):
         # If no config specified, search for existing configs
         if config_file is None:
             config_file = self.find_config_file()
         
         self.config_file = config_file
+        # Absolute paths for display and cron entries, resolved once
+        self._abs_config = os.path.abspath(config_file)
+        self._abs_script = os.path.abspath(sys.argv[0])
         self.config = self.load_config()
+        self._refresh_settings()
+
+        # Long-lived mysql client shared by the small metadata queries
+        self._mysql_proc = None
+        self._mysql_proc_args = None
+        # One query at a time on that client: the users/grants export runs
+        # on a worker thread while step 1 of a backup may query too
+        self._mysql_lock = threading.Lock()
+        # Built on first webhook and reused for later notifications
+        self._webhook_opener = None
+        # Backup base directories already created by this instance
+        self._dirs_ok = set()
+        # Resolved paths of external commands, so PATH is searched once
+        self._tool_paths = {}
+        # Backup directory sizes for list_backups, keyed by path and
+        # validated against the directory's (inode, mtime)
+        self._size_cache = {}
+        # Main menu jump table; "0" (exit) is handled by the menu loop
+        self._menu = {
+            "1": lambda: self.backup_databases("hourly"),
+            "2": lambda: self.backup_databases("daily"),
+            "3": lambda: self.backup_databases("monthly"),
+            "4": self._menu_manual_backup,
+            "5": self._menu_list_backups,
+            "6": self._menu_restore,
+            "7": self._menu_restore_as_slave,
+            "8": self.configure_settings,
+            "9": self._menu_test_connection,
+            "10": self.manage_schedule,
+        }
     
+    def _refresh_settings(self):
+        """Snapshot the config into plain dicts for lookups on hot paths
+
+        Must be called again whenever self.config is modified or replaced.
+        """
+        self.settings = {
+            section: self._section_values(section)
+            for section in self.config.sections()
+        }
+        # Connection args are derived from [mysql]; rebuild on next use
+        self._mysql_conn_args = None
+
+    def _section_values(self, section):
+        """Interpolated values of one section, raw where interpolation fails
+
+        A literal % (a webhook URL with %20, a password) is not valid
+        interpolation syntax. Lookups used to be lazy, so such a value only
+        mattered where it was read; keep it as written instead of failing
+        the whole snapshot.
+        """
+        values = {}
+        for key, raw in self.config.items(section, raw=True):
+            try:
+                values[key] = self.config.get(section, key)
+            except configparser.InterpolationError:
+                values[key] = raw
+        return values
+
     def find_config_file(self):
         """Find existing config file or determine where to create one"""
         # Priority order for searching/creating config files
-        search_locations = [
-            '/etc/mariadb_backup.conf',
-            os.path.expanduser('~/.config/mariadb_backup.conf'),
-            'mariadb_backup.conf',  # Current directory (last resort)
-        ]
+        search_locations = CONFIG_LOCATIONS
         
-        # Check if any exist
+        # Check if any exist, keeping the stat result for the warning below
         existing = []
         for loc in search_locations:
-            if os.path.exists(loc):
-                existing.append(loc)
+            try:
+                existing.append((loc, os.stat(loc)))
+            except OSError:
+                continue
         
         if len(existing) == 0:
             # No config exists, use first writable location
@@ -50,7 +209,7 @@ class MariaDBManager:
                 try:
                     # Try to create parent directory
                     parent = os.path.dirname(loc)
-                    if parent and not os.path.exists(parent):
+                    if parent:
                         os.makedirs(parent, exist_ok=True)
                     # Test if we can write there
                     test_file = loc + '.test'
@@ -65,28 +224,37 @@ class MariaDBManager:
         
         elif len(existing) == 1:
             # One config found, use it
-            return existing[0]
+            return existing[0][0]
         
         else:
             # Multiple configs found - warn and use first one
             print(f"\n⚠️  WARNING: Multiple config files found:")
-            for idx, loc in enumerate(existing, 1):
-                size = os.path.getsize(loc)
-                mtime = datetime.datetime.fromtimestamp(os.path.getmtime(loc))
+            for idx, (loc, st) in enumerate(existing, 1):
+                mtime = datetime.datetime.fromtimestamp(st.st_mtime)
                 print(f"  {idx}. {loc}")
-                print(f"     Size: {size} bytes, Modified: {mtime}")
+                print(f"     Size: {st.st_size} bytes, Modified: {mtime}")
             
-            print(f"\nUsing: {existing[0]}")
+            print(f"\nUsing: {existing[0][0]}")
             print(f"To use a different config, run with: --config <path>")
             print(f"Or delete unused config files.\n")
             
-            return existing[0]
+            return existing[0][0]
 
     def load_config(self):
         """Load configuration from file or create default"""
         config = configparser.ConfigParser()
 
-        if os.path.exists(self.config_file):
+        try:
+            st = os.stat(self.config_file)
+        except FileNotFoundError:
+            st = None
+
+        if st is not None:
+            cache_key = (self._abs_config, st.st_mtime_ns, st.st_size)
+            cached = _CONFIG_CACHE.get(cache_key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
             config.read(self.config_file)
             
             # Ensure all required sections exist
@@ -136,6 +304,8 @@ class MariaDBManager:
                 config.set('webhooks', 'success_url', '')
             if not config.has_option('webhooks', 'failure_url'):
                 config.set('webhooks', 'failure_url', '')
+
+            _CONFIG_CACHE[cache_key] = copy.deepcopy(config)
                 
         else:
             # Create default configuration
@@ -181,65 +351,29 @@ class MariaDBManager:
         if config is None:
             config = self.config
 
-        # Get absolute path
-        abs_path = os.path.abspath(self.config_file)
-        
-        # Debug output
-        print(f"\n  [DEBUG] save_config() called")
-        print(f"  [DEBUG] Target file: {abs_path}")
-        print(f"  [DEBUG] File exists before write: {os.path.exists(abs_path)}")
-        print(f"  [DEBUG] Sections to save: {config.sections()}")
-        
-        # Show what we're about to save
-        print(f"  [DEBUG] Values being saved:")
-        for section in config.sections():
-            print(f"    [{section}]")
-            for key, value in config.items(section):
-                if key == 'password':
-                    print(f"      {key} = {'*' * len(value) if value else '(empty)'}")
-                else:
-                    print(f"      {key} = {value}")
-        
+        # Drop cached parses of this file; they are stale after the write
+        for key in [k for k in _CONFIG_CACHE if k[0] == self._abs_config]:
+            del _CONFIG_CACHE[key]
+
+        # Write a private temp file, sync it and rename it over the target, so
+        # a crash mid-write never leaves a truncated config behind
+        tmp_file = f"{self.config_file}.tmp.{os.getpid()}"
         try:
-            # Write the file
-            with open(abs_path, "w") as f:
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            # O_CREAT's mode does not apply to a stale temp file left behind
+            os.fchmod(fd, 0o600)
+            with os.fdopen(fd, "w") as f:
                 config.write(f)
-            print(f"  [DEBUG] File write completed")
-            
-            # Set permissions
-            os.chmod(abs_path, 0o600)
-            print(f"  [DEBUG] Permissions set to 600")
-            
-            # Verify file was written
-            if os.path.exists(abs_path):
-                size = os.path.getsize(abs_path)
-                print(f"  [DEBUG] File verified: {size} bytes")
-                
-                # Read back first few lines to verify content
-                print(f"  [DEBUG] Reading back file contents:")
-                with open(abs_path, 'r') as f:
-                    lines = f.readlines()[:10]  # First 10 lines
-                    for line in lines:
-                        print(f"    {line.rstrip()}")
-                
-                # Try to parse it back
-                test_config = configparser.ConfigParser()
-                test_config.read(abs_path)
-                print(f"  [DEBUG] Parse verification: {len(test_config.sections())} sections")
-                
-                if test_config.has_section('mysql'):
-                    saved_host = test_config.get('mysql', 'host')
-                    print(f"  [DEBUG] Verified mysql.host = {saved_host}")
-                
-                return True
-            else:
-                print(f"  [DEBUG] ERROR: File does not exist after write!")
-                return False
-                
-        except Exception as e:
-            print(f"  [DEBUG] EXCEPTION during save: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+            return True
+        except OSError as e:
+            print(f"ERROR: Could not save configuration to {self.config_file}: {e}")
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
             return False
 
     def get_mysql_connection_args(self, host_override=None):
@@ -247,27 +381,746 @@ class MariaDBManager:
         
         Args:
             host_override: If provided, use this host instead of config host
+
+        Without an override the cached list is returned as is; callers
+        build new command lists with + and must not modify it.
         """
+        if not host_override and self._mysql_conn_args is not None:
+            return self._mysql_conn_args
+
         args = []
         
         # Use override if provided, otherwise use config
-        host = host_override if host_override else self.config['mysql']['host']
+        mysql_cfg = self.settings['mysql']
+        host = host_override if host_override else mysql_cfg['host']
         
         # Don't pass host parameter for localhost to use Unix socket connection
         # This avoids IPv6 issues where localhost might resolve to ::1
         if host.lower() != 'localhost':
             args.append(f"--host={host}")
             # Only add port when using TCP/IP connection (not Unix socket)
-            args.append(f"--port={self.config['mysql']['port']}")
+            args.append(f"--port={mysql_cfg['port']}")
         
         args.extend([
-            f"--user={self.config['mysql']['user']}",
-            f"--password={self.config['mysql']['password']}",
+            f"--user={mysql_cfg['user']}",
+            f"--password={mysql_cfg['password']}",
             "--max-allowed-packet=1G",
         ])
         
+        if not host_override:
+            self._mysql_conn_args = args
         return args
 
+    def _mysql_session(self):
+        """Return the shared mysql client process, (re)starting it if needed"""
+        args = self.get_mysql_connection_args()
+        proc = self._mysql_proc
+        if proc is not None and proc.poll() is None and self._mysql_proc_args == args:
+            return proc
+
+        self.close_mysql_session()
+        self._mysql_proc = subprocess.Popen(
+            [self._tool("mysql")] + args + ["-N", "-B", "--force", "--unbuffered"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        self._mysql_proc_args = args
+        return self._mysql_proc
+
+    def close_mysql_session(self):
+        """Shut down the shared mysql client process, if one is running"""
+        proc = self._mysql_proc
+        self._mysql_proc = None
+        self._mysql_proc_args = None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+
+    def _mysql_query(self, sql, allow_errors=False, timeout=None):
+        """Run SQL on the shared mysql session and return its output rows
+
+        Each query is followed by a marker SELECT that also reports
+        @@error_count, so the end of the output and failures can be detected
+        without starting a new client per query. Safe to call from several
+        threads; each write/read cycle holds the session lock.
+
+        Args:
+            sql: One or more ';'-terminated statements
+            allow_errors: Return the rows even if the last statement failed
+            timeout: Seconds to wait for the output (default
+                MYSQL_QUERY_TIMEOUT); the client is killed when it passes
+
+        Returns:
+            List of tab-separated output lines, or None on failure
+        """
+        sql = sql.strip()
+        if not sql.endswith(";"):
+            sql += ";"
+
+        with self._mysql_lock:
+            return self._mysql_exchange(sql, allow_errors, timeout or self.MYSQL_QUERY_TIMEOUT)
+
+    def _mysql_exchange(self, sql, allow_errors, timeout):
+        """Send sql to the session and read its rows; caller holds the lock"""
+        try:
+            proc = self._mysql_session()
+        except OSError:
+            self.close_mysql_session()
+            return None
+
+        # Write from a thread while reading here: a large batch (the grants
+        # export) fills the stdout pipe before mysql has read all of it
+        writer = threading.Thread(
+            target=self._write_session,
+            args=(proc, f"{sql}\nSELECT '{self.END_MARKER}', @@error_count;\n"),
+            daemon=True,
+        )
+        # A stalled server would block readline forever; killing the client
+        # ends the read with EOF
+        watchdog = threading.Timer(timeout, proc.kill)
+        writer.start()
+        watchdog.start()
+
+        rows = []
+        error_count = None
+        while True:
+            line = proc.stdout.readline()
+            if not line:
+                # Client exited (e.g. connection refused) or was killed
+                break
+            line = line.rstrip("\n")
+            if line.startswith(self.END_MARKER):
+                error_count = line.partition("\t")[2]
+                break
+            rows.append(line)
+
+        watchdog.cancel()
+        writer.join()
+        if error_count is None:
+            self.close_mysql_session()
+            return None
+        if error_count not in ("", "0") and not allow_errors:
+            return None
+        return rows
+
+    @staticmethod
+    def _write_session(proc, script):
+        """Write script to the session's stdin; a dead client ends the read"""
+        try:
+            proc.stdin.write(script)
+            proc.stdin.flush()
+        except (OSError, ValueError):
+            pass
+
+    def _fetch_user_grants(self):
+        """Return the CREATE USER / GRANT statements for every account
+
+        Returns:
+            List with one list of statements per account
+
+        Raises:
+            RuntimeError: If the account list cannot be read
+        """
+        # Get all users
+        user_rows = self._mysql_query(
+            "SELECT DISTINCT user, host FROM mysql.user WHERE user NOT IN ('mysql.sys', 'mariadb.sys', 'mysql.infoschema', 'mysql.session');"
+        )
+        if user_rows is None:
+            raise RuntimeError("could not list MySQL users")
+
+        rows = (line.split("\t") for line in user_rows)
+        users = [(row[0], row[1]) for row in rows if len(row) == 2]
+
+        # Fetch every CREATE USER / SHOW GRANTS in one batch;
+        # a marker row separates the output of each account
+        user_blocks = [[] for _ in users]
+        if users:
+            quote = self._sql_string
+            script = "".join(
+                f"SELECT '{self.USER_MARKER}';\n"
+                f"SHOW CREATE USER {quote(user)}@{quote(host)};\n"
+                f"SHOW GRANTS FOR {quote(user)}@{quote(host)};\n"
+                for user, host in users
+            )
+            idx = -1
+            for line in self._mysql_query(script, allow_errors=True) or []:
+                if line == self.USER_MARKER:
+                    idx += 1
+                    continue
+                statement = line.strip()
+                if statement and 0 <= idx < len(user_blocks):
+                    user_blocks[idx].append(statement)
+
+        return user_blocks
+
+    def _dump_with_mariabackup(self, target_dir, databases=None):
+        """Take a physical backup with mariabackup into target_dir
+
+        Data files are copied on [options] parallel threads. The copy must
+        be prepared (mariabackup --prepare) and copied back (mariabackup
+        --copy-back) with the server stopped to restore it. A databases list
+        makes it a partial backup of just those databases.
+
+        Returns:
+            (success, error message)
+        """
+        if not self._which("mariabackup"):
+            return False, "'mariabackup' command not found"
+
+        mysql_cfg = self.settings["mysql"]
+        cmd = [
+            self._tool("mariabackup"),
+            "--backup",
+            f"--target-dir={target_dir}",
+            f"--parallel={self._parallelism()}",
+            f"--user={mysql_cfg['user']}",
+            f"--password={mysql_cfg['password']}",
+        ]
+        if mysql_cfg["host"].lower() != "localhost":
+            cmd += [f"--host={mysql_cfg['host']}", f"--port={mysql_cfg['port']}"]
+        if databases:
+            cmd.append(f"--databases={' '.join(databases)}")
+
+        result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return False, result.stderr.strip()[-2000:]
+        return True, None
+
+    def _backup_user_grants(self, path, compressor=None):
+        """Write every account's CREATE USER / GRANT statements to path
+
+        Returns:
+            Size of the written file in bytes
+        """
+        lines = [
+            "-- Users and Grants Backup\n",
+            f"-- Created: {datetime.datetime.now()}\n\n",
+        ]
+        for block in self._fetch_user_grants():
+            for statement in block:
+                lines.append(f"{statement};\n")
+            lines.append("\n")
+
+        return self._write_backup_data("".join(lines).encode("utf-8"), path, compressor)
+
+    def _mydumper_connection_args(self):
+        """Connection options understood by both mydumper and myloader"""
+        mysql_cfg = self.settings["mysql"]
+        args = [f"--user={mysql_cfg['user']}", f"--password={mysql_cfg['password']}"]
+        if mysql_cfg["host"].lower() != "localhost":
+            args += [f"--host={mysql_cfg['host']}", f"--port={mysql_cfg['port']}"]
+        return args
+
+    def _dump_with_mydumper(self, target_dir, compress, databases=None):
+        """Dump all databases (or just databases) with mydumper, one table per thread
+
+        Rows are written in 50k-row chunks so large tables are split across
+        threads too. Like mysqldump --single-transaction, consistency relies
+        on InnoDB transactions (--trx-consistency-only).
+
+        Returns:
+            (success, error message)
+        """
+        if not self._which("mydumper"):
+            return False, "'mydumper' command not found"
+
+        cmd = [
+            self._tool("mydumper"),
+            f"--outputdir={target_dir}",
+            f"--threads={self._parallelism()}",
+            "--trx-consistency-only",
+            "--rows=50000",
+            "--triggers",
+            "--events",
+            "--routines",
+        ] + self._mydumper_connection_args()
+        if compress:
+            cmd.append("--compress")
+        if databases:
+            names = "|".join(re.escape(db) for db in databases)
+            cmd.append(f"--regex=^({names})\\.")
+
+        result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return False, result.stderr.strip()[-2000:]
+        return True, None
+
+    def _filter_databases(self, available, wanted):
+        """Limit the server's database names to the requested ones
+
+        Args:
+            available: Database names found on the server
+            wanted: Requested names, or None for all of them
+
+        Returns:
+            (list of names, error message or None)
+        """
+        if wanted is None:
+            return list(available), None
+        missing = [db for db in wanted if db not in available]
+        if missing:
+            return [], f"unknown database(s): {', '.join(missing)}"
+        return list(wanted), None
+
+    def _database_sizes(self):
+        """Return {database: data + index bytes} for the non-system databases
+
+        Returns:
+            Dict, or None if the databases could not be listed
+        """
+        rows = self._mysql_query(
+            "SELECT s.schema_name, COALESCE(SUM(t.data_length + t.index_length), 0)"
+            " FROM information_schema.schemata s"
+            " LEFT JOIN information_schema.tables t ON t.table_schema = s.schema_name"
+            " GROUP BY s.schema_name;"
+        )
+        if rows is None:
+            return None
+
+        sizes = {}
+        for row in rows:
+            name, _, size = row.partition("\t")
+            if name and name.lower() not in self.SYSTEM_SCHEMAS:
+                sizes[name] = int(size or 0)
+        return sizes
+
+    def _dump_in_shards(self, target_dir, compressor=None, databases=None, sizes=None):
+        """Dump the databases with concurrent mysqldump --databases runs
+
+        Used for backup_method = parallel, and for mydumper when mydumper is
+        not installed. Databases are spread over up to [options] parallel
+        groups (default one per CPU), largest first, and each group is
+        dumped and compressed into its own db_group_<n>.sql file. Every
+        group is its own --single-transaction snapshot, so the groups are
+        not consistent with each other. A databases list limits the dump to
+        those databases. sizes is a _database_sizes() result taken earlier;
+        it is queried here if omitted.
+
+        Returns:
+            (success, error message)
+        """
+        if sizes is None:
+            sizes = self._database_sizes()
+        if sizes is None:
+            return False, "could not list databases"
+
+        names, error = self._filter_databases(sizes, databases)
+        if error:
+            return False, error
+        databases = [(sizes[name], name) for name in names]
+
+        # Largest databases first, each to the currently lightest group
+        groups = [[] for _ in range(min(len(databases), self._parallelism()))]
+        loads = [0] * len(groups)
+        for size, name in sorted(databases, reverse=True):
+            idx = loads.index(min(loads))
+            groups[idx].append(name)
+            loads[idx] += size
+
+        base_cmd = (
+            [self._tool("mysqldump")]
+            + self.get_mysql_connection_args()
+            + [
+                "--single-transaction",
+                "--routines",
+                "--triggers",
+                "--events",
+                "--hex-blob",
+                "--add-drop-database",
+                "--quick",
+                "--skip-dump-date",
+            ]
+        )
+        if self._use_network_compression():
+            base_cmd.append("--compress")
+        suffix = compressor["suffix"] if compressor else ""
+        os.makedirs(target_dir, exist_ok=True)
+
+        def dump_group(idx):
+            path = os.path.join(target_dir, f"db_group_{idx}.sql{suffix}")
+            return self._write_command_output(
+                base_cmd + ["--databases"] + groups[idx], path, compressor
+            )
+
+        if not groups:
+            return True, None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            results = list(pool.map(dump_group, range(len(groups))))
+
+        errors = [
+            f"{', '.join(group)}: {stderr.strip()[-2000:]}"
+            for group, (code, stderr) in zip(groups, results)
+            if code != 0
+        ]
+        if errors:
+            return False, "; ".join(errors)
+        return True, None
+
+    def _dump_with_tab(self, target_dir, databases=None):
+        """Dump each database as per-table files with mysqldump --tab
+
+        Every database gets a directory holding <table>.sql (schema) and
+        <table>.txt (tab-separated rows) plus _objects.sql with its triggers,
+        routines and events. The server writes the .txt files itself, so it
+        must run on this host and be allowed to write there (FILE privilege,
+        secure_file_priv); while dumping, each directory is writable by the
+        group of [options] mysqld_user (default mysql) and nobody else. Up
+        to [options] parallel databases are dumped at once, each in its own
+        transaction, so the result is not a single consistent snapshot
+        across databases. A databases list limits the dump to those
+        databases.
+
+        Returns:
+            (success, error message)
+        """
+        host = self.settings["mysql"]["host"].strip().lower()
+        if host not in ("localhost", "127.0.0.1", "::1"):
+            return False, "per-table (--tab) backups need the server on this host"
+
+        rows = self._mysql_query("SHOW DATABASES;")
+        if rows is None:
+            return False, "could not list databases"
+        names = (row.strip() for row in rows)
+        databases, error = self._filter_databases(
+            [name for name in names if name and name.lower() not in self.SYSTEM_SCHEMAS],
+            databases,
+        )
+        if error:
+            return False, error
+
+        base_cmd = (
+            [self._tool("mysqldump")]
+            + self.get_mysql_connection_args()
+            + [
+                "--single-transaction",
+                "--hex-blob",
+                "--default-character-set=utf8mb4",
+                "--skip-dump-date",
+            ]
+        )
+        os.makedirs(target_dir, exist_ok=True)
+
+        # Imported here: only per-table dumps need the server's account
+        import pwd
+        mysqld_user = self.settings["options"].get("mysqld_user", "mysql").strip() or "mysql"
+        try:
+            mysqld_gid = pwd.getpwnam(mysqld_user).pw_gid
+        except KeyError:
+            return False, f"mysqld user '{mysqld_user}' not found (set [options] mysqld_user)"
+
+        def dump_database(db):
+            db_dir = os.path.join(target_dir, db)
+            os.mkdir(db_dir, 0o700)
+            try:
+                # mysqld writes the .txt files, so its group (and only its
+                # group) gets write access while dumping
+                try:
+                    os.chown(db_dir, -1, mysqld_gid)
+                    os.chmod(db_dir, 0o770)
+                except OSError as e:
+                    return 1, f"could not give {mysqld_user} write access to {db_dir}: {e}"
+                # Table data and schema; triggers go to _objects.sql so they
+                # are created after the rows are loaded
+                result = subprocess.run(
+                    base_cmd + ["--skip-triggers", f"--tab={db_dir}", db],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
+                if result.returncode != 0:
+                    return result.returncode, result.stderr
+                return self._write_command_output(
+                    base_cmd
+                    + ["--no-create-info", "--no-data", "--no-create-db",
+                       "--triggers", "--routines", "--events", db],
+                    os.path.join(db_dir, "_objects.sql"),
+                )
+            finally:
+                os.chmod(db_dir, 0o750)
+                try:
+                    os.chown(db_dir, -1, os.getgid())
+                except OSError:
+                    pass
+
+        if not databases:
+            return True, None
+        workers = min(len(databases), self._parallelism())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(dump_database, databases))
+
+        errors = [
+            f"{db}: {stderr.strip()[-2000:]}"
+            for db, (code, stderr) in zip(databases, results)
+            if code != 0
+        ]
+        if errors:
+            return False, "; ".join(errors)
+        return True, None
+
+    def _restore_tab_database(self, db_dir):
+        """Restore one database directory written by _dump_with_tab
+
+        Schema, LOAD DATA for every table and the trigger/routine file run in
+        a single mysql session with foreign key and unique checks disabled.
+
+        Returns:
+            (returncode, stderr text)
+        """
+        db = os.path.basename(db_dir)
+        names = sorted(os.listdir(db_dir))
+        tables = [name[:-4] for name in names if name.endswith(".txt")]
+        # Tables first so views (schema file, no data file) find their bases
+        schema = [name for name in names if name.endswith(".sql") and name[:-4] in tables]
+        schema += [
+            name for name in names
+            if name.endswith(".sql") and name[:-4] not in tables and name != "_objects.sql"
+        ]
+
+        def quote_name(name):
+            return "`" + name.replace("`", "``") + "`"
+
+        script = [
+            f"CREATE DATABASE IF NOT EXISTS {quote_name(db)};\n".encode("utf-8"),
+            f"USE {quote_name(db)};\n".encode("utf-8"),
+            b"SET FOREIGN_KEY_CHECKS=0;\nSET UNIQUE_CHECKS=0;\n",
+        ]
+        for name in schema:
+            with open(os.path.join(db_dir, name), "rb") as f:
+                script.append(f.read())
+            script.append(b"\n")
+        for table in tables:
+            path = self._sql_string(os.path.join(db_dir, table + ".txt"))
+            script.append(
+                f"LOAD DATA LOCAL INFILE {path} INTO TABLE {quote_name(table)} "
+                f"CHARACTER SET utf8mb4;\n".encode("utf-8")
+            )
+        if "_objects.sql" in names:
+            with open(os.path.join(db_dir, "_objects.sql"), "rb") as f:
+                script.append(f.read())
+
+        result = subprocess.run(
+            [self._tool("mysql")] + self._bulk_mysql_args() + ["--local-infile=1"],
+            input=b"".join(script),
+            stderr=subprocess.PIPE,
+        )
+        return result.returncode, result.stderr.decode("utf-8", errors="replace")
+
+    def _restore_with_myloader(self, mydumper_dir):
+        """Load a mydumper backup with myloader, one table per thread
+
+        Existing tables are dropped and recreated, matching the DROP
+        DATABASE statements replayed from a logical dump.
+
+        Returns:
+            (success, error message)
+        """
+        if not self._which("myloader"):
+            return False, "'myloader' command not found"
+
+        cmd = [
+            self._tool("myloader"),
+            f"--directory={mydumper_dir}",
+            f"--threads={self._parallelism()}",
+            "--overwrite-tables",
+            "--queries-per-transaction=50000",
+        ] + self._mydumper_connection_args()
+        if self._use_network_compression():
+            cmd.append("--compress-protocol")
+
+        result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return False, self._format_restore_error(result.stderr)
+        return True, None
+
+    def _restore_from_tab(self, tables_dir):
+        """Restore a per-table backup, loading databases in parallel
+
+        Returns:
+            (success, error message)
+        """
+        with os.scandir(tables_dir) as it:
+            db_dirs = [entry.path for entry in it if entry.is_dir()]
+        if not db_dirs:
+            return True, None
+
+        workers = min(len(db_dirs), self._parallelism())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(self._restore_tab_database, db_dirs)
+            errors = [
+                f"{os.path.basename(db_dir)}: {self._format_restore_error(stderr)}"
+                for db_dir, (code, stderr) in zip(db_dirs, results)
+                if code != 0
+            ]
+        if errors:
+            return False, "; ".join(errors)
+        return True, None
+
+    def _restore_from_shards(self, shards_dir):
+        """Restore a backup written by _dump_in_shards, groups in parallel
+
+        Each group holds different databases, so the files can be replayed
+        through separate mysql clients at the same time.
+
+        Returns:
+            (success, error message)
+        """
+        with os.scandir(shards_dir) as it:
+            paths = sorted(
+                entry.path for entry in it
+                if entry.name.startswith("db_group_") and entry.is_file()
+            )
+        if not paths:
+            return True, None
+
+        workers = min(len(paths), self._parallelism())
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(self._pipe_to_mysql, paths)
+            errors = [
+                f"{os.path.basename(path)}: {self._format_restore_error(stderr)}"
+                for path, (code, stderr, _) in zip(paths, results)
+                if code != 0
+            ]
+        if errors:
+            return False, "; ".join(errors)
+        return True, None
+
+    def _select_compressor(self):
+        """Pick the backup compressor from [options] compressor
+
+        'auto' (default) uses zstd when installed (smaller files, much
+        cheaper to decompress on restore), then pigz, then the in-process
+        gzip module; 'pigz', 'gzip' and 'zstd' force a choice, falling back
+        to gzip if the tool is not installed. [options] compression_level
+        overrides each tool's default level (zstd 3, pigz 6, gzip 9).
+        zstd_long = yes adds zstd's 128 MiB long-distance matching, which
+        finds the repeats a dump has across tables at the cost of memory.
+
+        Returns:
+            Dict with the compressor 'name', the file 'suffix' it produces,
+            the external 'command' to pipe through (None means compress
+            in-process with the gzip module) and the gzip module 'level'
+        """
+        options = self.settings["options"]
+        choice = options.get("compressor", "auto").strip().lower()
+        level = options.get("compression_level", "").strip()
+        if not level.isdigit():
+            level = None
+        in_process = {
+            "name": "gzip (in-process)",
+            "suffix": ".gz",
+            "command": None,
+            "level": min(int(level), 9) if level else 9,
+        }
+
+        if choice == "gzip":
+            return in_process
+        if choice in ("auto", "zstd"):
+            if self._which("zstd"):
+                command = [self._tool("zstd"), "-T0", f"-{level or 3}", "-q", "-c"]
+                # A 2^27 window is the largest zstd and the zstandard
+                # module decompress without extra flags
+                if options.get("zstd_long", "no").strip().lower() == "yes":
+                    command.append("--long=27")
+                return {"name": "zstd", "suffix": ".zst", "command": command}
+            if choice == "zstd":
+                print("WARNING: zstd not found, falling back to gzip compression")
+        elif choice == "pigz" and not self._which("pigz"):
+            print("WARNING: pigz not found, falling back to in-process gzip compression")
+
+        if self._which("pigz"):
+            # -n: no timestamp in the header, so unchanged dumps stay identical
+            command = [self._tool("pigz"), "-c", "-n"]
+            if level:
+                command.append(f"-{level}")
+            return {"name": "pigz", "suffix": ".gz", "command": command}
+        return in_process
+
+    def _write_command_output(self, cmd, path, compressor=None):
+        """Run cmd and stream its stdout into path, compressing if requested
+
+        Returns:
+            (returncode, stderr text)
+        """
+        with open(path, "wb") as f, tempfile.TemporaryFile() as err:
+            if compressor is None:
+                returncode = subprocess.run(
+                    cmd, stdout=f, stderr=err, stdin=subprocess.DEVNULL
+                ).returncode
+            else:
+                proc = subprocess.Popen(
+                    cmd, stdout=subprocess.PIPE, stderr=err, stdin=subprocess.DEVNULL
+                )
+                self._grow_pipe(proc.stdout)
+                pipe = None
+                try:
+                    if compressor["command"]:
+                        pipe = subprocess.Popen(compressor["command"], stdin=proc.stdout, stdout=f)
+                        # Let the compressor own the read end so cmd sees EPIPE if it dies
+                        proc.stdout.close()
+                        pipe.wait()
+                        pipe_returncode = pipe.returncode
+                    else:
+                        level = compressor["level"]
+                        with gzip.GzipFile(
+                            fileobj=f, mode="wb", compresslevel=level, mtime=0
+                        ) as gz:
+                            shutil.copyfileobj(proc.stdout, gz, 1 << 20)
+                        proc.stdout.close()
+                        pipe_returncode = 0
+                except BaseException:
+                    # Don't leave a half-written dump being compressed behind
+                    for child in (proc, pipe):
+                        if child is not None:
+                            child.kill()
+                            child.wait()
+                    raise
+                returncode = proc.wait() or pipe_returncode
+
+            # The dump is not read back, so keep it from crowding out the
+            # server's own page cache
+            f.flush()
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+            err.seek(0)
+            return returncode, err.read().decode(errors="replace")
+
+    def _grow_pipe(self, pipe, size=1 << 20):
+        """Raise a pipe's capacity to size bytes where Linux allows it
+
+        The default 64 KiB forces a context switch between the dump and the
+        compressor every few blocks.
+        """
+        try:
+            import fcntl
+            fcntl.fcntl(pipe.fileno(), getattr(fcntl, "F_SETPIPE_SZ", 1031), size)
+        except (ImportError, OSError):
+            pass
+
+    def _write_backup_data(self, data, path, compressor=None):
+        """Write bytes to path, compressing if requested
+
+        Returns:
+            Size of the written file in bytes
+        """
+        with open(path, "wb") as f:
+            if compressor is None:
+                f.write(data)
+            elif compressor["command"]:
+                subprocess.run(compressor["command"], input=data, stdout=f, check=True)
+            else:
+                with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=compressor["level"]) as gz:
+                    gz.write(data)
+            # The compressor child shares this file offset, so this is the size
+            return f.tell()
+
     def _format_restore_error(self, stderr):
         """Format restore errors to avoid printing huge SQL statements"""
         if not stderr:
@@ -291,16 +1144,13 @@ class MariaDBManager:
 
     def _get_server_packet_sizes(self):
         """Get global/session max_allowed_packet values in bytes."""
-        cmd = (
-            ["mysql"]
-            + self.get_mysql_connection_args()
-            + ["-N", "-B", "-e", "SELECT @@global.max_allowed_packet, @@session.max_allowed_packet;"]
+        rows = self._mysql_query(
+            "SELECT @@global.max_allowed_packet, @@session.max_allowed_packet;"
         )
-        result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
-        if result.returncode != 0 or not result.stdout.strip():
+        if not rows:
             return None, None
 
-        parts = result.stdout.strip().split("\t")
+        parts = rows[0].split("\t")
         if len(parts) < 2:
             return None, None
 
@@ -311,61 +1161,268 @@ class MariaDBManager:
 
     def _try_raise_global_packet_size(self, target_bytes=1073741824):
         """Best-effort attempt to raise global max_allowed_packet."""
-        cmd = (
-            ["mysql"]
-            + self.get_mysql_connection_args()
-            + ["-e", f"SET GLOBAL max_allowed_packet={target_bytes};"]
+        return self._mysql_query(f"SET GLOBAL max_allowed_packet={target_bytes};") is not None
+
+    def _pipe_to_mysql(self, path, skip_table=None):
+        """Feed a (possibly compressed) SQL file through the mysql client
+
+        Args:
+            path: SQL dump, plain or compressed
+            skip_table: Drop this table's INSERT statements on the way through
+
+        Returns:
+            (returncode, tail of mysql's stderr, number of INSERTs skipped)
+        """
+        # Keep these Popen calls free of preexec_fn/user/group options:
+        # CPython then starts the children with vfork/posix_spawn instead of
+        # a full fork, which matters once the process holds large buffers
+        fmt = self._detect_compression(path)
+        source, decompressor = self._open_backup_file(path, fmt)
+        feed_error = None
+        skipped = 0
+        try:
+            if skip_table or (decompressor is None and fmt is not None):
+                # Filtering and in-process decompression have no fd to hand
+                # over; feed mysql from a worker thread while this one drains
+                # stderr
+                mysql = subprocess.Popen(
+                    [self._tool("mysql")] + self._bulk_mysql_args(),
+                    stdin=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+                feed_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+                feeder = feed_pool.submit(self._copy_to_stdin, source, mysql.stdin, skip_table)
+                feed_pool.shutdown(wait=False)
+                stderr = self._stderr_tail(mysql.stderr)
+                mysql.wait()
+                feed_error = feeder.exception()
+                if feed_error is None:
+                    skipped = feeder.result()
+            else:
+                mysql = subprocess.Popen(
+                    [self._tool("mysql")] + self._bulk_mysql_args(),
+                    stdin=source,
+                    stderr=subprocess.PIPE,
+                )
+                if decompressor:
+                    # Let mysql own the read end so the decompressor sees EPIPE if it dies
+                    source.close()
+                stderr = self._stderr_tail(mysql.stderr)
+                mysql.wait()
+        finally:
+            source.close()
+            if decompressor:
+                decompressor.wait()
+
+        # A corrupt or truncated archive just ends mysql's input early, so
+        # mysql can succeed on a partial dump; report the decompression failure
+        if mysql.returncode == 0:
+            if feed_error is not None:
+                return 1, f"Could not decompress {path}: {feed_error}", skipped
+            if decompressor and decompressor.returncode != 0:
+                return (
+                    decompressor.returncode,
+                    f"{decompressor.args[0]} could not decompress {path}",
+                    skipped,
+                )
+        return mysql.returncode, stderr, skipped
+
+    def _stderr_tail(self, stream, max_lines=200):
+        """Read a child's stderr to EOF, keeping only the last max_lines lines
+
+        stderr is the only pipe on these children, so plain line iteration
+        cannot deadlock and memory stays bounded however much mysql reports.
+        """
+        tail = collections.deque(stream, maxlen=max_lines)
+        stream.close()
+        return b"".join(tail).decode("utf-8", errors="replace")
+
+    def _sql_string(self, value):
+        """Quote value as a MariaDB string literal (what pymysql's escaping does)"""
+        escaped = (
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("'", "\\'")
+            .replace("\0", "\\0")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+            .replace("\x1a", "\\Z")
         )
-        result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
-        return result.returncode == 0
-
-    def _run_restore_from_file(self, sql_file):
-        """Run mysql restore from an existing SQL file path."""
-        with open(sql_file, "r") as f:
-            mysql = subprocess.Popen(
-                ["mysql"] + self.get_mysql_connection_args(),
-                stdin=f,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            _, stderr = mysql.communicate()
-            return mysql.returncode, stderr
-
-    def _create_filtered_restore_file(self, db_file, is_compressed, skip_table):
-        """Create temporary SQL file with INSERTs for selected table removed."""
-        temp_sql = tempfile.NamedTemporaryFile(mode="w", suffix=".sql", delete=False)
-        temp_path = temp_sql.name
-        temp_sql.close()
-
-        skip_prefix = f"INSERT INTO `{skip_table}`"
-        skipped_lines = 0
-
-        if is_compressed:
-            gunzip = subprocess.Popen(
-                ["gunzip", "-c", db_file],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            source = gunzip.stdout
+        return f"'{escaped}'"
+
+    def _configure_slave_cli(self, conn_args, change_master):
+        """Point this server at a master using one mysql client session
+
+        Without --force the client stops at the first failing statement and
+        its stderr names the line.
+
+        Returns:
+            (success, SHOW SLAVE STATUS output or error text)
+        """
+        quote = self._sql_string
+        slave_sql = f"""
+        STOP SLAVE;
+        RESET SLAVE ALL;
+        CHANGE MASTER TO
+            MASTER_HOST={quote(change_master['host'])},
+            MASTER_USER={quote(change_master['user'])},
+            MASTER_PASSWORD={quote(change_master['password'])},
+            MASTER_PORT={int(change_master['port'])},
+            MASTER_LOG_FILE={quote(change_master['log_file'])},
+            MASTER_LOG_POS={int(change_master['log_pos'])};
+        START SLAVE;
+        SHOW SLAVE STATUS\\G
+        """
+        result = subprocess.run(
+            [self._tool("mysql")] + conn_args,
+            input=slave_sql,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            return False, result.stderr
+        return True, result.stdout
+
+    def _pymysql_connect_kwargs(self):
+        """pymysql.connect() arguments for the configured server
+
+        Returns None when localhost is configured but no socket file can be
+        found, so callers fall back to the mysql client.
+        """
+        mysql_cfg = self.settings["mysql"]
+        kwargs = {
+            "user": mysql_cfg["user"],
+            "password": mysql_cfg["password"],
+            "connect_timeout": 10,
+        }
+        if mysql_cfg["host"].lower() == "localhost":
+            sockets = [path for path in self.SOCKET_LOCATIONS if os.path.exists(path)]
+            if not sockets:
+                return None
+            kwargs["unix_socket"] = sockets[0]
         else:
-            gunzip = None
-            source = open(db_file, "r")
+            kwargs["host"] = mysql_cfg["host"]
+            kwargs["port"] = int(mysql_cfg["port"])
+        return kwargs
+
+    def _configure_slave_pymysql(self, connect_kwargs, change_master):
+        """Point this server at a master over a single pymysql connection
+
+        Returns:
+            (success, SHOW SLAVE STATUS as "Field: value" lines or error text)
+        """
+        try:
+            conn = pymysql.connect(**connect_kwargs)
+        except pymysql.MySQLError as e:
+            return False, str(e)
 
         try:
-            with open(temp_path, "w") as out:
+            with conn.cursor() as cursor:
+                cursor.execute("STOP SLAVE")
+                cursor.execute("RESET SLAVE ALL")
+                cursor.execute(
+                    "CHANGE MASTER TO MASTER_HOST=%s, MASTER_USER=%s, MASTER_PASSWORD=%s, "
+                    "MASTER_PORT=%s, MASTER_LOG_FILE=%s, MASTER_LOG_POS=%s",
+                    (
+                        change_master["host"],
+                        change_master["user"],
+                        change_master["password"],
+                        change_master["port"],
+                        change_master["log_file"],
+                        change_master["log_pos"],
+                    ),
+                )
+                cursor.execute("START SLAVE")
+                cursor.execute("SHOW SLAVE STATUS")
+                row = cursor.fetchone() or ()
+                names = [column[0] for column in cursor.description or ()]
+        except pymysql.MySQLError as e:
+            return False, str(e)
+        finally:
+            conn.close()
+
+        return True, "\n".join(f"{name}: {value}" for name, value in zip(names, row))
+
+    def _copy_to_stdin(self, source, stdin, skip_table=None):
+        """Copy source into a child's stdin, then close it
+
+        Copies in large chunks, or line by line when skip_table's INSERT
+        statements are to be dropped.
+
+        Returns:
+            Number of INSERT statements skipped
+        """
+        skipped = 0
+        try:
+            if skip_table:
+                skip_prefix = f"INSERT INTO `{skip_table}`".encode("utf-8")
                 for line in source:
                     if line.startswith(skip_prefix):
-                        skipped_lines += 1
-                        continue
-                    out.write(line)
+                        skipped += 1
+                    else:
+                        stdin.write(line)
+            else:
+                shutil.copyfileobj(source, stdin, 1 << 18)
+        except BrokenPipeError:
+            # mysql exited early; its stderr explains why
+            pass
         finally:
-            if source:
-                source.close()
-            if gunzip:
-                gunzip.wait()
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
+        return skipped
+
+    def _detect_compression(self, path):
+        """Identify a backup file's compression from its magic bytes
+
+        Returns:
+            'gzip', 'zstd', 'lz4' or None for plain SQL
+        """
+        with open(path, "rb") as f:
+            magic = f.read(4)
+        for fmt, signature in self.COMPRESSION_MAGIC.items():
+            if magic.startswith(signature):
+                return fmt
+        return None
+
+    def _decompress_command(self, fmt):
+        """External command that decompresses a backup file of this format
+        to stdout, or None when the file is read in-process
+
+        pigz keeps gzip decompression from bottlenecking the restore; without
+        it the gzip module does the work without spawning gunzip. zstd falls
+        back to the zstandard module when the zstd binary is missing.
+        """
+        if fmt == "zstd" and (self._which("zstd") or zstandard is None):
+            return [self._tool("zstd"), "-dc", "-T0"]
+        if fmt == "lz4":
+            return [self._tool("lz4"), "-dc"]
+        if fmt == "gzip" and self._which("pigz"):
+            return [self._tool("pigz"), "-dc", "-p", str(os.cpu_count() or 1)]
+        return None
+
+    def _open_backup_file(self, path, fmt=None):
+        """Open a backup SQL file as a binary stream, decompressing it
+
+        fmt is the result of _detect_compression (detected here if omitted).
 
-        return temp_path, skipped_lines
+        Returns:
+            Tuple of (readable binary stream, decompressor process or None)
+        """
+        if fmt is None:
+            fmt = self._detect_compression(path)
+        cmd = self._decompress_command(fmt)
+        if cmd:
+            proc = subprocess.Popen(cmd + [path], stdout=subprocess.PIPE)
+            return proc.stdout, proc
+        if fmt == "gzip":
+            return gzip.open(path, "rb"), None
+        if fmt == "zstd":
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+            # Buffered so callers can iterate lines as with the other streams
+            return io.BufferedReader(reader, 1 << 18), None
+        return open(path, "rb"), None
 
     def test_connection(self):
         """Test MySQL connection"""
@@ -377,67 +1434,45 @@ class MariaDBManager:
             # Show connection method being used
             host = self.config['mysql']['host']
             user = self.config['mysql']['user']
-            host_to_use = host
-            use_tcp = False
-            
+            port = self.config['mysql']['port']
+
             if host.lower() == 'localhost':
                 print(f"Attempting connection as {user} via Unix socket...")
-                
-                # Check for socket file
-                socket_locations = [
-                    '/var/run/mysqld/mysqld.sock',
-                    '/var/lib/mysql/mysql.sock',
-                    '/tmp/mysql.sock',
-                    '/run/mysqld/mysqld.sock',
-                ]
-                socket_found = False
-                for sock in socket_locations:
-                    if os.path.exists(sock):
-                        print(f"  Found socket: {sock}")
-                        socket_found = True
-                        break
-                if not socket_found:
-                    print("  Warning: Standard MySQL socket file not found")
-            else:
-                use_tcp = True
-                host_to_use = host
-                
-            if use_tcp:
-                print(f"Attempting connection to {host_to_use}:{self.config['mysql']['port']} as {user}...")
-            elif host.lower() == 'localhost':
-                print(f"Attempting connection as {user} via Unix socket...")
-                
+
                 # Check for common socket file locations
-                socket_locations = [
-                    '/var/run/mysqld/mysqld.sock',
-                    '/var/lib/mysql/mysql.sock',
-                    '/tmp/mysql.sock',
-                    '/run/mysqld/mysqld.sock',
-                ]
-                socket_found = False
-                for sock in socket_locations:
-                    if os.path.exists(sock):
-                        print(f"  Found socket: {sock}")
-                        socket_found = True
-                        break
-                if not socket_found:
+                sockets = [sock for sock in self.SOCKET_LOCATIONS if os.path.exists(sock)]
+                if sockets:
+                    print(f"  Found socket: {sockets[0]}")
+                else:
                     print("  Warning: Standard MySQL socket file not found")
             else:
-                port = self.config['mysql']['port']
                 print(f"Attempting connection to {host}:{port} as {user}...")
-            
+
+            # An open shared session already holds a connection; ping it
+            # instead of starting and authenticating another client. Same 5s
+            # limit as the one-shot client below, which is tried if it passes
+            proc = self._mysql_proc
+            if (
+                proc is not None
+                and proc.poll() is None
+                and self._mysql_proc_args == self.get_mysql_connection_args()
+            ):
+                if self._mysql_query("SELECT 1;", timeout=5) == ["1"]:
+                    print("  Verified on the open mysql session")
+                    return True
+                print("  Open mysql session did not answer; starting a new client")
+
             # Check if mysql client exists
-            check_mysql = subprocess.run(['which', 'mysql'], capture_output=True, text=True)
-            if check_mysql.returncode != 0:
+            if not self._which("mysql"):
                 print("ERROR: 'mysql' command not found. Please install MySQL/MariaDB client.")
                 return False
-            
+
             # Add connection timeout and skip-reconnect to prevent hanging
             # --no-defaults prevents reading config files that might cause hanging
             # --skip-ssl avoids TLS handshake issues that can cause errors or hanging
             cmd = (
-                ["mysql", "--no-defaults"]
-                + self.get_mysql_connection_args(host_override=None)  # Use config host (localhost for socket)
+                [self._tool("mysql"), "--no-defaults"]
+                + self.get_mysql_connection_args()  # Use config host (localhost for socket)
                 + [
                     "--skip-ssl",
                     "--connect-timeout=5",
@@ -510,33 +1545,275 @@ class MariaDBManager:
             print(f"Connection test failed: {type(e).__name__}: {str(e)}")
             return False
 
-    def notify_backup_webhook(self, success, backup_type, backup_dir, message=None):
-        """Send webhook notification if configured."""
+    def _which(self, name):
+        """shutil.which(name), looked up once per manager"""
+        if name not in self._tool_paths:
+            self._tool_paths[name] = shutil.which(name)
+        return self._tool_paths[name]
+
+    def _tool(self, name):
+        """argv[0] for an external command: its resolved path, else the bare name"""
+        return self._which(name) or name
+
+    def _use_network_compression(self):
+        """Whether to compress the client/server protocol
+
+        'auto' compresses for remote servers only; on a local host it would
+        just burn CPU.
+        """
+        setting = self.settings["options"].get("mysql_network_compression", "auto").strip().lower()
+        if setting == "auto":
+            host = self.settings["mysql"]["host"].strip().lower()
+            return host not in ("localhost", "127.0.0.1", "::1")
+        return setting == "yes"
+
+    def _parallelism(self):
+        """Worker count for parallel dumps and restores
+
+        Read from [options] parallel; defaults to one per CPU.
+        """
+        try:
+            return max(1, int(self.settings["options"].get("parallel", "")))
+        except ValueError:
+            return os.cpu_count() or 1
+
+    def _bulk_mysql_args(self):
+        """mysql client arguments for sessions that stream a whole dump"""
+        if self._use_network_compression():
+            return self.get_mysql_connection_args() + ["--compress"]
+        return self.get_mysql_connection_args()
+
+    def _dir_size(self, path):
+        """Sum the sizes of the regular files under path, recursively
+
+        Symlinks are not followed. Backup methods other than logical keep
+        their data in a subdirectory (mariabackup/, mydumper/, databases/,
+        tables/).
+
+        Returns:
+            Tuple of (total bytes, True if some entries could not be read,
+            {subdirectory path: (st_ino, st_mtime_ns)} taken before each
+            subdirectory was listed). Raises OSError if path itself cannot
+            be scanned.
+        """
+        total = 0
+        incomplete = False
+        subdirs = {}
+        pending = [path]
+        while pending:
+            current = pending.pop()
+            try:
+                it = os.scandir(current)
+            except OSError:
+                if current == path:
+                    raise
+                incomplete = True
+                continue
+            with it:
+                for entry in it:
+                    try:
+                        if entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                        elif entry.is_dir(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            subdirs[entry.path] = (st.st_ino, st.st_mtime_ns)
+                            pending.append(entry.path)
+                    except OSError:
+                        incomplete = True
+        return total, incomplete, subdirs
+
+    def _cached_dir_size(self, path, stamp):
+        """_dir_size() for a listed backup, reusing the last complete result
+
+        stamp is the backup directory's (st_ino, st_mtime_ns). Backups are
+        only ever written into a freshly created directory, so a matching
+        stamp means the contents are unchanged. A file added or removed
+        below a subdirectory only changes that subdirectory's stamp, so
+        the subdirectories seen by the last scan are checked as well.
+        """
+        cached = self._size_cache.get(path)
+        if cached is not None and cached[0] == stamp and self._stamps_match(cached[2]):
+            return cached[1], False
+        size, incomplete, subdirs = self._dir_size(path)
+        if not incomplete:
+            self._size_cache[path] = (stamp, size, subdirs)
+        return size, incomplete
+
+    @staticmethod
+    def _stamps_match(stamps):
+        """True if every {path: (st_ino, st_mtime_ns)} entry is unchanged"""
+        for sub_path, sub_stamp in stamps.items():
+            try:
+                st = os.stat(sub_path, follow_symlinks=False)
+            except OSError:
+                return False
+            if (st.st_ino, st.st_mtime_ns) != sub_stamp:
+                return False
+        return True
+
+    def _latest_backup_dir(self, exclude):
+        """Return the newest finished backup directory in any tier, or None
+
+        A backup counts as finished once it has a MANIFEST.txt; exclude is
+        the backup being written.
+        """
+        latest, latest_mtime = None, None
+        for base_dir in set(self.settings["backup_paths"].values()):
+            try:
+                with os.scandir(base_dir) as it:
+                    entries = [
+                        entry for entry in it
+                        if entry.name.startswith("backup_")
+                        and entry.path != exclude
+                        and entry.is_dir(follow_symlinks=False)
+                    ]
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    mtime = os.stat(os.path.join(entry.path, "MANIFEST.txt")).st_mtime
+                except OSError:
+                    continue
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest, latest_mtime = entry.path, mtime
+        return latest
+
+    def _file_digest(self, path):
+        """Hex SHA-256 of a file
+
+        hashlib.file_digest (Python 3.11+) hashes unbuffered reads without
+        holding the GIL; older versions read 256 KiB blocks.
+        """
+        with open(path, "rb", buffering=0) as f:
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: f.read(1 << 18), b""):
+                digest.update(chunk)
+            return digest.hexdigest()
+
+    def _backup_files(self, backup_dir):
+        """Relative paths of every file in a backup, sorted"""
+        paths = []
+        for root, _, names in os.walk(backup_dir):
+            rel_root = os.path.relpath(root, backup_dir)
+            for name in names:
+                paths.append(os.path.normpath(os.path.join(rel_root, name)))
+        paths.sort()
+        return paths
+
+    def _write_checksums(self, backup_dir):
+        """Write SHA256SUMS (sha256sum -c format) for every file in backup_dir
+
+        Files are hashed in parallel. Returns the size of SHA256SUMS.
+        """
+        paths = self._backup_files(backup_dir)
+        workers = min(len(paths), self._parallelism()) or 1
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            digests = pool.map(
+                self._file_digest, [os.path.join(backup_dir, rel) for rel in paths]
+            )
+            lines = [f"{digest}  {rel}\n" for digest, rel in zip(digests, paths)]
+        with open(os.path.join(backup_dir, self.CHECKSUM_FILE), "w") as f:
+            f.write("".join(lines))
+            return f.tell()
+
+    def verify_backup(self, backup_path):
+        """Check a backup's files against its SHA256SUMS
+
+        Returns:
+            (ok, list of problems); ok is None when the backup has no checksums
+        """
+        try:
+            with open(os.path.join(backup_path, self.CHECKSUM_FILE)) as f:
+                expected = [line.rstrip("\n").split("  ", 1) for line in f if line.strip()]
+        except FileNotFoundError:
+            return None, []
+
+        def check(entry):
+            digest, rel = entry
+            try:
+                if self._file_digest(os.path.join(backup_path, rel)) != digest:
+                    return f"{rel}: checksum mismatch"
+            except OSError as e:
+                return f"{rel}: {e.strerror}"
+            return None
+
+        workers = min(len(expected), self._parallelism()) or 1
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            problems = [problem for problem in pool.map(check, expected) if problem]
+        return not problems, problems
+
+    def _link_unchanged_files(self, work_dir, previous_dir):
+        """Hard-link files identical to the previous backup's copy
+
+        Each file in work_dir is compared with the file at the same relative
+        path in previous_dir; only same-sized pairs are hashed. A match is
+        replaced by a link to the earlier file, so unchanged dumps take no
+        extra space across backups and tiers.
+
+        Returns:
+            Number of bytes saved
+        """
+        saved = 0
+        for root, dirs, names in os.walk(work_dir):
+            if root == work_dir and "mariabackup" in dirs:
+                # mariabackup --prepare rewrites its files in place, which
+                # would change every backup sharing them
+                dirs.remove("mariabackup")
+            rel_root = os.path.relpath(root, work_dir)
+            for name in names:
+                path = os.path.join(root, name)
+                previous = os.path.normpath(os.path.join(previous_dir, rel_root, name))
+                try:
+                    st, prev_st = os.stat(path), os.stat(previous)
+                    if st.st_size != prev_st.st_size or st.st_size == 0:
+                        continue
+                    if self._file_digest(path) != self._file_digest(previous):
+                        continue
+                    tmp_link = path + ".link"
+                    os.link(previous, tmp_link)
+                    os.replace(tmp_link, path)
+                except OSError as e:
+                    if e.errno == errno.EXDEV:
+                        # Different filesystem: nothing further can be linked
+                        return saved
+                    continue
+                saved += st.st_size
+        return saved
+
+    def notify_backup_webhook(self, success, backup_type, backup_dir, message=None, timestamp=None):
+        """Send webhook notification if configured.
+
+        timestamp is an ISO-8601 UTC string; defaults to the current time.
+        """
         url_key = 'success_url' if success else 'failure_url'
-        webhooks_cfg = self.config['webhooks'] if self.config.has_section('webhooks') else {}
-        url = webhooks_cfg.get(url_key, '').strip() if hasattr(webhooks_cfg, 'get') else ''
+        url = self.settings.get('webhooks', {}).get(url_key, '').strip()
         if not url:
             return
 
+        # Imported here: urllib.request pulls in http.client, email and ssl,
+        # which runs without a webhook never need
+        import urllib.error
+        import urllib.request
+
+        if timestamp is None:
+            timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
         payload = {
             "status": "success" if success else "failure",
             "backup_type": backup_type,
             "backup_dir": backup_dir,
             "backup_name": os.path.basename(backup_dir) if backup_dir else None,
-            "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
+            "timestamp": timestamp,
         }
         if message:
             payload["message"] = message
 
         # Include simple size info when available
-        if backup_dir and os.path.exists(backup_dir):
+        if backup_dir:
             try:
-                size_bytes = sum(
-                    os.path.getsize(os.path.join(backup_dir, f))
-                    for f in os.listdir(backup_dir)
-                    if os.path.isfile(os.path.join(backup_dir, f))
-                )
-                payload["size_bytes"] = size_bytes
+                payload["size_bytes"] = self._dir_size(backup_dir)[0]
             except OSError:
                 pass
 
@@ -545,7 +1822,9 @@ class MariaDBManager:
             req = urllib.request.Request(
                 url, data=data, headers={"Content-Type": "application/json"}
             )
-            with urllib.request.urlopen(req, timeout=10) as resp:
+            if self._webhook_opener is None:
+                self._webhook_opener = urllib.request.build_opener()
+            with self._webhook_opener.open(req, timeout=10) as resp:
                 resp.read()
             print(f"Webhook sent to {url_key}: {url}")
         except (urllib.error.URLError, urllib.error.HTTPError, TimeoutError) as e:
@@ -556,14 +1835,9 @@ class MariaDBManager:
     def get_master_status(self):
         """Get master replication status"""
         try:
-            cmd = (
-                ["mysql"]
-                + self.get_mysql_connection_args()
-                + ["-N", "-B", "-e", "SHOW MASTER STATUS;"]
-            )
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0 and result.stdout.strip():
-                parts = result.stdout.strip().split("\t")
+            rows = self._mysql_query("SHOW MASTER STATUS;")
+            if rows and rows[0].strip():
+                parts = rows[0].split("\t")
                 if len(parts) >= 2:
                     return {
                         "binlog_file": parts[0],
@@ -576,13 +1850,42 @@ class MariaDBManager:
             print(f"Error getting master status: {e}")
             return None
 
-    def backup_databases(self, backup_type="manual", backup_path=None):
+    def _dump_master_status(self, path, max_lines=200):
+        """Binlog position written by mysqldump --master-data=2 into path
+
+        Only the start of the dump is read (and decompressed).
+
+        Returns:
+            Dict shaped like get_master_status(), or None if not found
+        """
+        source, decompressor = self._open_backup_file(path)
+        try:
+            for lineno, line in enumerate(source):
+                if lineno >= max_lines:
+                    break
+                match = _CHANGE_MASTER_RE.match(line)
+                if match:
+                    return {
+                        "binlog_file": match.group(1).decode("utf-8"),
+                        "binlog_position": match.group(2).decode("ascii"),
+                        "binlog_do_db": "",
+                        "binlog_ignore_db": "",
+                    }
+            return None
+        finally:
+            # Closing early stops an external decompressor with EPIPE
+            source.close()
+            if decompressor:
+                decompressor.wait()
+
+    def backup_databases(self, backup_type="manual", backup_path=None, databases=None):
         """
         Backup all databases with users, grants, and replication info
 
         Args:
             backup_type: 'hourly', 'daily', 'monthly', or 'manual'
             backup_path: Override backup path from config
+            databases: Only back up these databases (default: all)
         """
         print(f"\n{'='*60}")
         print(f"Starting {backup_type.upper()} Backup")
@@ -592,17 +1895,21 @@ class MariaDBManager:
         if backup_path:
             base_dir = backup_path
         elif backup_type in ["hourly", "daily", "monthly"]:
-            base_dir = self.config["backup_paths"][backup_type]
+            base_dir = self.settings["backup_paths"][backup_type]
         else:
-            base_dir = self.config["backup_paths"].get(
+            base_dir = self.settings["backup_paths"].get(
                 "daily", "/var/backups/mariadb/manual"
             )
 
-        # Create base directory
-        os.makedirs(base_dir, exist_ok=True)
+        # Create base directory (once per instance)
+        if base_dir not in self._dirs_ok:
+            os.makedirs(base_dir, exist_ok=True)
+            self._dirs_ok.add(base_dir)
 
         # Generate backup name based on type
         now = datetime.datetime.now()
+        # Webhook timestamp, formatted once for whichever notification fires
+        started_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
         if backup_type == "hourly":
             # Same hour overwrites: hourly_YYYYMMDD_HH
             backup_name = f"hourly_{now.strftime('%Y%m%d_%H')}"
@@ -618,17 +1925,37 @@ class MariaDBManager:
 
         backup_dir = os.path.join(base_dir, f"backup_{backup_name}")
 
-        # Remove existing backup if it exists (for overwrite behavior)
-        if os.path.exists(backup_dir):
-            print(f"Removing existing backup: {backup_dir}")
-            shutil.rmtree(backup_dir)
-
-        os.makedirs(backup_dir, exist_ok=True)
+        # A backup of this period that finished moments ago (e.g. cron
+        # misconfigured to fire repeatedly) is kept rather than redumped
+        try:
+            manifest_age = now.timestamp() - os.stat(os.path.join(backup_dir, "MANIFEST.txt")).st_mtime
+        except OSError:
+            manifest_age = None
+        if manifest_age is not None and 0 <= manifest_age < self.RECENT_BACKUP_SECONDS:
+            print(f"Backup already recent ({int(manifest_age)}s old), skipping: {backup_dir}")
+            return True
+
+        # Write into a staging directory and swap it in once complete, so a
+        # failed run leaves the previous backup of this period intact. Clear
+        # anything an interrupted run left behind first
+        work_dir = backup_dir + ".new"
+        old_dir = backup_dir + ".old"
+        for leftover in (work_dir, old_dir):
+            shutil.rmtree(leftover, ignore_errors=True)
+
+        # base_dir is known to exist, so a single mkdir is enough
+        os.mkdir(work_dir)
 
         print(f"Backup directory: {backup_dir}")
 
+        users_future = None
+
         def notify_failure(reason):
-            self.notify_backup_webhook(False, backup_type, backup_dir, reason)
+            # Don't leave the users fetch running against the mysql session
+            if users_future is not None:
+                concurrent.futures.wait([users_future])
+            shutil.rmtree(work_dir, ignore_errors=True)
+            self.notify_backup_webhook(False, backup_type, backup_dir, reason, started_at)
             return False
 
         # Test connection
@@ -638,122 +1965,143 @@ class MariaDBManager:
 
         print("✓ MySQL connection successful")
 
-        # Get master status for replication
-        master_status = self.get_master_status()
+        # Compression happens while the files are written, so no
+        # uncompressed copy ever lands on disk
+        options = self.settings["options"]
+        backup_method = options.get("backup_method", "logical").strip().lower()
+
+        # Get master status for replication. Logical dumps record it in
+        # their header (--master-data=2) at the dump's own snapshot, so it
+        # is read from there once the dump is written
+        master_status = None
+        if backup_method in ("mariabackup", "mydumper", "parallel", "tab"):
+            master_status = self.get_master_status()
+
+        compress = options.get("compression", "yes").lower() == "yes"
+        compressor = self._select_compressor() if compress else None
+        suffix = compressor["suffix"] if compressor else ""
+
+        # Per-group dumps size their groups from one session query; take it
+        # now so step 1 does not wait behind the users/grants export
+        use_shards = backup_method == "parallel" or (
+            backup_method == "mydumper" and not self._which("mydumper")
+        )
+        shard_sizes = None
+        if use_shards:
+            shard_sizes = self._database_sizes()
+            if shard_sizes is None:
+                print("ERROR: Could not list databases")
+                return notify_failure("Parallel backup failed")
+
+        # Fetch, format and compress users and grants on the shared mysql
+        # session while the dump runs. _mysql_query holds the session lock
+        # for each exchange, so a step 1 query (the tab method's SHOW
+        # DATABASES) just waits for the export's batch instead of mixing
+        # its output with it
+        users_file = os.path.join(work_dir, f"users_and_grants.sql{suffix}")
+        users_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        users_future = users_pool.submit(self._backup_user_grants, users_file, compressor)
+        users_pool.shutdown(wait=False)
+
+        # Files written into backup_dir as (name, size); size None = directory.
+        # Collected as each step finishes so the manifest needs no rescan
+        files_written = []
 
         # 1. Backup all databases
-        print("\n[1/5] Backing up all databases...")
-        db_backup_file = os.path.join(backup_dir, "all_databases.sql")
+        if backup_method == "mariabackup":
+            print("\n[1/5] Backing up all databases (mariabackup physical copy)...")
+            physical_dir = os.path.join(work_dir, "mariabackup")
+            ok, error = self._dump_with_mariabackup(physical_dir, databases)
+            if not ok:
+                print(f"ERROR: mariabackup failed: {error}")
+                return notify_failure("Physical backup failed")
+            files_written.append(("mariabackup/", None))
+            print(f"✓ Physical backup completed: {physical_dir}")
+            print("  Restore with: mariabackup --prepare, then --copy-back (server stopped)")
+        elif use_shards:
+            print("\n[1/5] Backing up all databases (mysqldump per database group, parallel)...")
+            if backup_method == "mydumper":
+                print("  mydumper not found; dumping groups of databases concurrently instead")
+            shards_dir = os.path.join(work_dir, "databases")
+            ok, error = self._dump_in_shards(shards_dir, compressor, databases, shard_sizes)
+            if not ok:
+                print(f"ERROR: Parallel backup failed: {error}")
+                return notify_failure("Parallel backup failed")
+            files_written.append(("databases/", None))
+            print(f"✓ Parallel backup completed: {shards_dir}")
+            print("  Note: each database group is its own snapshot, not one consistent snapshot")
+        elif backup_method == "mydumper":
+            print("\n[1/5] Backing up all databases (mydumper, parallel)...")
+            mydumper_dir = os.path.join(work_dir, "mydumper")
+            ok, error = self._dump_with_mydumper(mydumper_dir, compress, databases)
+            if not ok:
+                print(f"ERROR: mydumper failed: {error}")
+                return notify_failure("Parallel backup failed")
+            files_written.append(("mydumper/", None))
+            print(f"✓ Parallel backup completed: {mydumper_dir}")
+        elif backup_method == "tab":
+            print("\n[1/5] Backing up all databases (per-table files)...")
+            tables_dir = os.path.join(work_dir, "tables")
+            ok, error = self._dump_with_tab(tables_dir, databases)
+            if not ok:
+                print(f"ERROR: Per-table backup failed: {error}")
+                return notify_failure("Per-table backup failed")
+            files_written.append(("tables/", None))
+            print(f"✓ Per-table backup completed: {tables_dir}")
+            print("  Note: each database is its own snapshot, not one consistent snapshot")
+        else:
+            print("\n[1/5] Backing up all databases...")
+            db_backup_file = os.path.join(work_dir, f"all_databases.sql{suffix}")
 
-        mysqldump_cmd = (
-            ["mysqldump"]
-            + self.get_mysql_connection_args()
-            + [
-                "--all-databases",
-                "--single-transaction",
-                "--routines",
-                "--triggers",
-                "--events",
-                "--flush-privileges",
-                "--hex-blob",
-                "--master-data=2",  # Comments out CHANGE MASTER command
-                "--add-drop-database",
-                "--quick",
-            ]
-        )
+            mysqldump_cmd = (
+                [self._tool("mysqldump")]
+                + self.get_mysql_connection_args()
+                + (["--databases"] + databases if databases else ["--all-databases"])
+                + [
+                    "--single-transaction",
+                    "--routines",
+                    "--triggers",
+                    "--events",
+                    "--flush-privileges",
+                    "--hex-blob",
+                    "--master-data=2",  # Comments out CHANGE MASTER command
+                    "--add-drop-database",
+                    "--quick",
+                    "--skip-dump-date",
+                ]
+            )
 
-        try:
-            with open(db_backup_file, "w") as f:
-                result = subprocess.run(
-                    mysqldump_cmd, stdout=f, stderr=subprocess.PIPE, text=True, stdin=subprocess.DEVNULL
+            if self._use_network_compression():
+                mysqldump_cmd.append("--compress")
+
+            try:
+                returncode, dump_stderr = self._write_command_output(
+                    mysqldump_cmd, db_backup_file, compressor
                 )
 
-            if result.returncode != 0:
-                print(f"ERROR: Database backup failed: {result.stderr}")
-                return notify_failure("Database backup failed")
+                if returncode != 0:
+                    print(f"ERROR: Database backup failed: {dump_stderr}")
+                    return notify_failure("Database backup failed")
 
-            print(
-                f"✓ Database backup completed: {os.path.getsize(db_backup_file)} bytes"
-            )
-        except Exception as e:
-            print(f"ERROR: Database backup failed: {e}")
-            return notify_failure("Database backup crashed")
+                db_size = os.path.getsize(db_backup_file)
+                files_written.append((os.path.basename(db_backup_file), db_size))
+                master_status = self._dump_master_status(db_backup_file)
+                print(f"✓ Database backup completed: {db_size} bytes")
+            except Exception as e:
+                print(f"ERROR: Database backup failed: {e}")
+                return notify_failure("Database backup crashed")
 
         # 2. Backup users and grants
         print("\n[2/5] Backing up users and grants...")
-        users_file = os.path.join(backup_dir, "users_and_grants.sql")
-
         try:
-            # Get all users
-            get_users_cmd = (
-                ["mysql"]
-                + self.get_mysql_connection_args()
-                + [
-                    "-N",
-                    "-B",
-                    "-e",
-                    "SELECT DISTINCT user, host FROM mysql.user WHERE user NOT IN ('mysql.sys', 'mariadb.sys', 'mysql.infoschema', 'mysql.session');",
-                ]
-            )
-            result = subprocess.run(get_users_cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
-
-            with open(users_file, "w") as f:
-                f.write("-- Users and Grants Backup\n")
-                f.write(f"-- Created: {datetime.datetime.now()}\n\n")
-
-                for line in result.stdout.strip().split("\n"):
-                    if line.strip():
-                        parts = line.split("\t")
-                        if len(parts) == 2:
-                            user, host = parts
-
-                            # Get CREATE USER statement
-                            show_create_cmd = (
-                                ["mysql"]
-                                + self.get_mysql_connection_args()
-                                + [
-                                    "-N",
-                                    "-B",
-                                    "-e",
-                                    f"SHOW CREATE USER '{user}'@'{host}';",
-                                ]
-                            )
-                            create_result = subprocess.run(
-                                show_create_cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL
-                            )
-                            if create_result.returncode == 0:
-                                f.write(f"{create_result.stdout.strip()};\n")
-
-                            # Get GRANTS
-                            show_grants_cmd = (
-                                ["mysql"]
-                                + self.get_mysql_connection_args()
-                                + [
-                                    "-N",
-                                    "-B",
-                                    "-e",
-                                    f"SHOW GRANTS FOR '{user}'@'{host}';",
-                                ]
-                            )
-                            grants_result = subprocess.run(
-                                show_grants_cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL
-                            )
-                            if grants_result.returncode == 0:
-                                for grant_line in grants_result.stdout.strip().split(
-                                    "\n"
-                                ):
-                                    if grant_line.strip():
-                                        f.write(f"{grant_line.strip()};\n")
-
-                            f.write("\n")
-
+            files_written.append((os.path.basename(users_file), users_future.result()))
             print(f"✓ Users and grants backup completed")
         except Exception as e:
             print(f"WARNING: Users backup failed: {e}")
 
         # 3. Save replication information
         print("\n[3/5] Saving replication information...")
-        repl_info_file = os.path.join(backup_dir, "replication_info.json")
+        repl_info_file = os.path.join(work_dir, "replication_info.json")
 
         replication_info = {
             "backup_time": now.isoformat(),
@@ -763,34 +2111,20 @@ class MariaDBManager:
             "server_uuid": None,
         }
 
-        # Get server ID
-        try:
-            cmd = (
-                ["mysql"]
-                + self.get_mysql_connection_args()
-                + ["-N", "-B", "-e", "SELECT @@server_id;"]
-            )
-            result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
-            if result.returncode == 0:
-                replication_info["server_id"] = result.stdout.strip()
-        except:
-            pass
-
-        # Get server UUID
-        try:
-            cmd = (
-                ["mysql"]
-                + self.get_mysql_connection_args()
-                + ["-N", "-B", "-e", "SELECT @@server_uuid;"]
-            )
-            result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
-            if result.returncode == 0:
-                replication_info["server_uuid"] = result.stdout.strip()
-        except:
-            pass
+        # Get server ID; only MySQL has @@server_uuid, so it is asked for
+        # when the version shows the server is not MariaDB
+        rows = self._mysql_query("SELECT @@server_id, @@version;")
+        if rows:
+            server_id, _, version = rows[0].partition("\t")
+            replication_info["server_id"] = server_id.strip()
+            if "mariadb" not in version.lower():
+                uuid_rows = self._mysql_query("SELECT @@server_uuid;")
+                if uuid_rows:
+                    replication_info["server_uuid"] = uuid_rows[0].strip()
 
         with open(repl_info_file, "w") as f:
             json.dump(replication_info, f, indent=2)
+            files_written.append((os.path.basename(repl_info_file), f.tell()))
 
         print(f"✓ Replication info saved")
         if master_status:
@@ -798,9 +2132,24 @@ class MariaDBManager:
                 f"  Master binlog: {master_status['binlog_file']}:{master_status['binlog_position']}"
             )
 
+        # Share unchanged files with the most recent backup of any tier
+        if options.get("dedup", "no").strip().lower() == "yes":
+            previous_dir = self._latest_backup_dir(exclude=work_dir)
+            if previous_dir:
+                saved = self._link_unchanged_files(work_dir, previous_dir)
+                if saved:
+                    print(f"\n✓ Linked unchanged files from {previous_dir} ({saved:,} bytes saved)")
+
+        # Checksums cover everything written so far; the manifest is
+        # rewritten for each backup anyway
+        if options.get("checksums", "no").strip().lower() == "yes":
+            size = self._write_checksums(work_dir)
+            files_written.append((self.CHECKSUM_FILE, size))
+            print(f"✓ Checksums written to {self.CHECKSUM_FILE}")
+
         # 4. Create backup manifest
         print("\n[4/5] Creating backup manifest...")
-        manifest_file = os.path.join(backup_dir, "MANIFEST.txt")
+        manifest_file = os.path.join(work_dir, "MANIFEST.txt")
 
         with open(manifest_file, "w") as f:
             f.write(f"MariaDB Backup Manifest\n")
@@ -808,14 +2157,16 @@ class MariaDBManager:
             f.write(f"Backup Type: {backup_type}\n")
             f.write(f"Backup Time: {now}\n")
             f.write(f"Backup Name: {backup_name}\n")
-            f.write(f"Backup Directory: {backup_dir}\n\n")
+            f.write(f"Backup Directory: {backup_dir}\n")
+            f.write(f"Compression: {compressor['name'] if compressor else 'none'}\n")
+            f.write(f"Databases: {', '.join(databases) if databases else 'all'}\n\n")
 
             f.write(f"Files:\n")
-            for item in os.listdir(backup_dir):
-                if item != "MANIFEST.txt":
-                    item_path = os.path.join(backup_dir, item)
-                    size = os.path.getsize(item_path)
-                    f.write(f"  - {item} ({size:,} bytes)\n")
+            for name, size in files_written:
+                if size is None:
+                    f.write(f"  - {name} (directory)\n")
+                else:
+                    f.write(f"  - {name} ({size:,} bytes)\n")
 
             f.write(f"\nReplication Status:\n")
             if master_status:
@@ -826,17 +2177,20 @@ class MariaDBManager:
 
         print(f"✓ Manifest created")
 
-        # 5. Compress if enabled
-        if self.config["options"].get("compression", "yes").lower() == "yes":
-            print("\n[5/5] Compressing backup...")
-            try:
-                subprocess.run(["gzip", "-f", db_backup_file], check=True)
-                print(f"✓ Database file compressed")
-
-                subprocess.run(["gzip", "-f", users_file], check=True)
-                print(f"✓ Users file compressed")
-            except Exception as e:
-                print(f"WARNING: Compression failed: {e}")
+        # Swap the finished backup in; each rename is a single directory
+        # entry update, and the old copy is deleted only once replaced
+        try:
+            os.rename(backup_dir, old_dir)
+        except FileNotFoundError:
+            old_dir = None
+        os.rename(work_dir, backup_dir)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+            print(f"Replaced existing backup: {backup_dir}")
+
+        # 5. Compression (applied while writing the dump files)
+        if compressor:
+            print(f"\n[5/5] Backup files compressed with {compressor['name']} while writing")
         else:
             print("\n[5/5] Compression disabled")
 
@@ -848,7 +2202,7 @@ class MariaDBManager:
         print(f"Backup completed successfully!")
         print(f"Location: {backup_dir}")
         print(f"{'='*60}\n")
-        self.notify_backup_webhook(True, backup_type, backup_dir, "Backup completed")
+        self.notify_backup_webhook(True, backup_type, backup_dir, "Backup completed", started_at)
         return True
 
     def rotate_backups(self, backup_type, base_dir):
@@ -860,7 +2214,7 @@ class MariaDBManager:
             base_dir: Base directory where backups are stored
         """
         # Get retention limit from config
-        keep_count = self.config['rotation'].getint(f'{backup_type}_keep', 0)
+        keep_count = int(self.settings['rotation'].get(f'{backup_type}_keep', 0))
         
         if keep_count <= 0:
             print(f"Rotation disabled for {backup_type} backups (keep_count: {keep_count})")
@@ -870,14 +2224,17 @@ class MariaDBManager:
         
         # Find all backup directories in this location
         backup_dirs = []
-        if os.path.exists(base_dir):
-            for item in os.listdir(base_dir):
-                item_path = os.path.join(base_dir, item)
-                # Match backup directories for this specific type
-                if os.path.isdir(item_path) and item.startswith(f"backup_{backup_type}_"):
-                    # Get modification time
-                    mtime = os.path.getmtime(item_path)
-                    backup_dirs.append((item_path, mtime, item))
+        type_prefix = f"backup_{backup_type}_"
+        try:
+            with os.scandir(base_dir) as it:
+                for entry in it:
+                    # Match backup directories for this specific type
+                    if entry.name.startswith(type_prefix) and entry.is_dir(follow_symlinks=False):
+                        # Get modification time from the cached directory entry
+                        mtime = entry.stat(follow_symlinks=False).st_mtime
+                        backup_dirs.append((entry.path, mtime, entry.name))
+        except FileNotFoundError:
+            pass
         
         # Sort by modification time (newest first)
         backup_dirs.sort(key=lambda x: x[1], reverse=True)
@@ -909,36 +2266,50 @@ class MariaDBManager:
         )
 
         all_backups = []
+        stamps = {}
+
+        # Prefixes of the typed naming pattern; anything else starting with
+        # "backup_" is an old-style (untyped) backup
+        typed_prefixes = tuple(f"backup_{t}_" for t in ["hourly", "daily", "monthly", "manual"])
 
         for btype in types_to_check:
-            path = self.config["backup_paths"].get(btype)
-            if path and os.path.exists(path):
+            path = self.settings["backup_paths"].get(btype)
+            type_prefix = f"backup_{btype}_"
+            if path:
                 try:
-                    items = os.listdir(path)
+                    with os.scandir(path) as it:
+                        items = list(it)
+                except FileNotFoundError:
+                    continue
                 except (OSError, IOError, PermissionError) as e:
                     print(f"Warning: Could not read {btype} backup directory {path}: {e}")
                     continue
                     
-                for item in items:
+                for entry in items:
+                    item = entry.name
                     try:
-                        item_path = os.path.join(path, item)
-                        # Skip if we can't access the item (broken symlinks, permission issues)
-                        if not os.path.exists(item_path):
-                            continue
-                            
+                        item_path = entry.path
+                        
                         # Match both old and new naming patterns for backwards compatibility
-                        if os.path.isdir(item_path) and (item.startswith(f"backup_{btype}_") or (item.startswith("backup_") and not any(item.startswith(f"backup_{t}_") for t in ["hourly", "daily", "monthly", "manual"]))):
-                            manifest_file = os.path.join(item_path, "MANIFEST.txt")
-                            if os.path.exists(manifest_file):
-                                mtime = os.path.getmtime(item_path)
+                        typed_match = item.startswith(type_prefix)
+                        untyped_match = (
+                            item.startswith("backup_")
+                            and not item.startswith(typed_prefixes)
+                        )
+                        if (typed_match or untyped_match) and entry.is_dir():
+                            # entry.path is already joined; skip os.path.join per entry
+                            manifest_file = item_path + os.sep + "MANIFEST.txt"
+                            if os.path.isfile(manifest_file):
+                                st = entry.stat()
                                 all_backups.append(
                                     {
                                         "type": btype,
                                         "name": item,
                                         "path": item_path,
-                                        "mtime": mtime,
+                                        "mtime": st.st_mtime,
                                     }
                                 )
+                                stamps[item_path] = (st.st_ino, st.st_mtime_ns)
                     except (OSError, IOError, PermissionError) as e:
                         # Skip items we can't access
                         print(f"Warning: Could not access backup item {item}: {e}")
@@ -956,19 +2327,12 @@ class MariaDBManager:
             backup_time = datetime.datetime.fromtimestamp(backup["mtime"])
             
             # Calculate size with error handling
-            size = 0
-            size_error = False
             try:
-                for f in os.listdir(backup["path"]):
-                    file_path = os.path.join(backup["path"], f)
-                    try:
-                        if os.path.isfile(file_path) and not os.path.islink(file_path):
-                            size += os.path.getsize(file_path)
-                    except (OSError, IOError) as e:
-                        # Skip files we can't read
-                        size_error = True
-                        continue
+                size, size_error = self._cached_dir_size(
+                    backup["path"], stamps[backup["path"]]
+                )
             except (OSError, IOError) as e:
+                size = 0
                 size_error = True
                 print(f"   Warning: Could not read some files in backup directory: {e}")
 
@@ -1007,35 +2371,73 @@ class MariaDBManager:
         print(f"Restoring Backup")
         print(f"{'='*60}\n")
 
-        if not os.path.exists(backup_path):
+        # One directory read tells us which backup files are present
+        try:
+            backup_files = set(os.listdir(backup_path))
+        except FileNotFoundError:
             print(f"ERROR: Backup path not found: {backup_path}")
             return False
+        except OSError as e:
+            print(f"ERROR: Could not read backup path {backup_path}: {e}")
+            return False
 
         print(f"Backup location: {backup_path}")
 
-        # Check for required files
-        db_backup_file = os.path.join(backup_path, "all_databases.sql")
-        db_backup_gz = os.path.join(backup_path, "all_databases.sql.gz")
-        users_file = os.path.join(backup_path, "users_and_grants.sql")
-        users_gz = os.path.join(backup_path, "users_and_grants.sql.gz")
+        # Check for required files (compressed variants preferred)
+        def find_backup_file(base_name):
+            for suffix in self.BACKUP_SUFFIXES:
+                if base_name + suffix in backup_files:
+                    return os.path.join(backup_path, base_name + suffix)
+            return None
+
+        db_file = find_backup_file("all_databases.sql")
+        users_restore_file = find_backup_file("users_and_grants.sql")
         repl_info_file = os.path.join(backup_path, "replication_info.json")
 
-        # Determine which files exist
-        if os.path.exists(db_backup_gz):
-            db_file = db_backup_gz
-            is_compressed = True
-        elif os.path.exists(db_backup_file):
-            db_file = db_backup_file
-            is_compressed = False
-        else:
+        # Determine which files exist; per-table, mydumper and per-group
+        # dumps take precedence
+        tables_dir = os.path.join(backup_path, "tables") if "tables" in backup_files else None
+        mydumper_dir = (
+            os.path.join(backup_path, "mydumper")
+            if tables_dir is None and "mydumper" in backup_files
+            else None
+        )
+        shards_dir = (
+            os.path.join(backup_path, "databases")
+            if tables_dir is None and mydumper_dir is None and "databases" in backup_files
+            else None
+        )
+        dump_dir = tables_dir or mydumper_dir or shards_dir
+        if dump_dir is None and "mariabackup" in backup_files and not any(
+            name.startswith("all_databases.sql") for name in backup_files
+        ):
+            print("ERROR: This is a physical (mariabackup) backup and cannot be replayed through mysql.")
+            print(f"   Stop MariaDB, then run:")
+            print(f"   mariabackup --prepare --target-dir={os.path.join(backup_path, 'mariabackup')}")
+            print(f"   mariabackup --copy-back --target-dir={os.path.join(backup_path, 'mariabackup')}")
+            return False
+        elif dump_dir is None and db_file is None:
             print("ERROR: Database backup file not found")
             return False
 
+        # Refuse to replay a damaged backup over the live databases
+        if self.CHECKSUM_FILE in backup_files:
+            print("Verifying checksums...")
+            ok, problems = self.verify_backup(backup_path)
+            if not ok:
+                print("ERROR: Backup failed checksum verification:")
+                for problem in problems[:20]:
+                    print(f"   {problem}")
+                return False
+            print("✓ Checksums verified")
+
         # Load replication info
         replication_info = None
-        if os.path.exists(repl_info_file):
+        try:
             with open(repl_info_file, "r") as f:
                 replication_info = json.load(f)
+        except FileNotFoundError:
+            pass
 
         # Confirm restoration
         print(f"\n⚠️  WARNING: This will REPLACE all databases on the target server!")
@@ -1047,16 +2449,11 @@ class MariaDBManager:
             print(f"   Mode: SLAVE (replication will be configured)")
             
             # Use config defaults if not provided
-            if not master_host and self.config.has_section('replication'):
-                master_host = self.config['replication'].get('master_host', '')
-            if not master_user and self.config.has_section('replication'):
-                master_user = self.config['replication'].get('master_user', '')
-            if not master_password and self.config.has_section('replication'):
-                master_password = self.config['replication'].get('master_password', '')
-            if not master_port and self.config.has_section('replication'):
-                master_port = self.config['replication'].get('master_port', '3306')
-            else:
-                master_port = master_port or '3306'
+            replication = self.settings.get('replication', {})
+            master_host = master_host or replication.get('master_host', '')
+            master_user = master_user or replication.get('master_user', '')
+            master_password = master_password or replication.get('master_password', '')
+            master_port = master_port or replication.get('master_port', '3306')
             
             if not master_host:
                 print(f"   ERROR: Master host required for slave setup")
@@ -1075,6 +2472,9 @@ class MariaDBManager:
             print("ERROR: Cannot connect to MySQL. Check your credentials.")
             return False
 
+        # Connection arguments for the mysql clients spawned below
+        conn_args = self.get_mysql_connection_args()
+
         # Preflight packet size check (server-side)
         global_packet, session_packet = self._get_server_packet_sizes()
         if global_packet and session_packet:
@@ -1097,57 +2497,40 @@ class MariaDBManager:
 
         # 1. Restore databases
         print("\n[1/3] Restoring databases...")
-        filtered_temp = None
         try:
-            if is_compressed:
-                # Decompress and pipe to mysql
-                gunzip = subprocess.Popen(
-                    ["gunzip", "-c", db_file], stdout=subprocess.PIPE
-                )
-                mysql = subprocess.Popen(
-                    ["mysql"] + self.get_mysql_connection_args(),
-                    stdin=gunzip.stdout,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                )
-                gunzip.stdout.close()
-                _, stderr = mysql.communicate()
-
-                if mysql.returncode != 0:
-                    lowered = (stderr or "").lower()
-                    if "server has gone away" in lowered and "bw_jobs_cache" in lowered:
-                        print(
-                            "WARNING: Restore failed on oversized bw_jobs_cache row; retrying while skipping bw_jobs_cache INSERTs..."
-                        )
-                        filtered_temp, skipped = self._create_filtered_restore_file(
-                            db_file, is_compressed, "bw_jobs_cache"
-                        )
-                        code, retry_stderr = self._run_restore_from_file(filtered_temp)
-                        if code != 0:
-                            print(
-                                f"ERROR: Database restore failed after fallback retry: {self._format_restore_error(retry_stderr)}"
-                            )
-                            return False
-                        print(
-                            f"✓ Databases restored with fallback (skipped {skipped} bw_jobs_cache INSERT statement(s))"
-                        )
-                    else:
-                        print(f"ERROR: Database restore failed: {self._format_restore_error(stderr)}")
-                        return False
+            if tables_dir:
+                ok, error = self._restore_from_tab(tables_dir)
+                if not ok:
+                    print(f"ERROR: Database restore failed: {error}")
+                    return False
+                print("✓ Databases restored from per-table files")
+            elif mydumper_dir:
+                ok, error = self._restore_with_myloader(mydumper_dir)
+                if not ok:
+                    print(f"ERROR: Database restore failed: {error}")
+                    return False
+                print("✓ Databases restored with myloader")
+            elif shards_dir:
+                ok, error = self._restore_from_shards(shards_dir)
+                if not ok:
+                    print(f"ERROR: Database restore failed: {error}")
+                    return False
+                print("✓ Databases restored from per-group dumps")
             else:
-                # Direct restore
-                code, stderr = self._run_restore_from_file(db_file)
+                # Decompresses on the fly for .gz/.zst backups
+                code, stderr, _ = self._pipe_to_mysql(db_file)
 
-                if code != 0:
+                if code == 0:
+                    print("✓ Databases restored successfully")
+                else:
                     lowered = (stderr or "").lower()
                     if "server has gone away" in lowered and "bw_jobs_cache" in lowered:
                         print(
                             "WARNING: Restore failed on oversized bw_jobs_cache row; retrying while skipping bw_jobs_cache INSERTs..."
                         )
-                        filtered_temp, skipped = self._create_filtered_restore_file(
-                            db_file, is_compressed, "bw_jobs_cache"
+                        code, retry_stderr, skipped = self._pipe_to_mysql(
+                            db_file, skip_table="bw_jobs_cache"
                         )
-                        code, retry_stderr = self._run_restore_from_file(filtered_temp)
                         if code != 0:
                             print(
                                 f"ERROR: Database restore failed after fallback retry: {self._format_restore_error(retry_stderr)}"
@@ -1159,57 +2542,22 @@ class MariaDBManager:
                     else:
                         print(f"ERROR: Database restore failed: {self._format_restore_error(stderr)}")
                         return False
-
-            if not filtered_temp:
-                print("✓ Databases restored successfully")
         except Exception as e:
             print(f"ERROR: Database restore failed: {e}")
             return False
-        finally:
-            if filtered_temp and os.path.exists(filtered_temp):
-                try:
-                    os.remove(filtered_temp)
-                except OSError:
-                    pass
 
         # 2. Restore users (optional)
         print("\n[2/3] Restoring users and grants...")
 
-        if os.path.exists(users_gz):
-            users_restore_file = users_gz
-            is_users_compressed = True
-        elif os.path.exists(users_file):
-            users_restore_file = users_file
-            is_users_compressed = False
-        else:
+        if not users_restore_file:
             print("WARNING: Users backup file not found, skipping")
-            users_restore_file = None
-
-        if users_restore_file:
+        else:
             try:
-                if is_users_compressed:
-                    gunzip = subprocess.Popen(
-                        ["gunzip", "-c", users_restore_file], stdout=subprocess.PIPE
-                    )
-                    mysql = subprocess.Popen(
-                        ["mysql"] + self.get_mysql_connection_args(),
-                        stdin=gunzip.stdout,
-                        stderr=subprocess.PIPE,
-                        text=True,
-                    )
-                    gunzip.stdout.close()
-                    _, stderr = mysql.communicate()
+                code, stderr, _ = self._pipe_to_mysql(users_restore_file)
+                if code != 0:
+                    print(f"WARNING: Users restore had errors: {self._format_restore_error(stderr)}")
                 else:
-                    with open(users_restore_file, "r") as f:
-                        mysql = subprocess.Popen(
-                            ["mysql"] + self.get_mysql_connection_args(),
-                            stdin=f,
-                            stderr=subprocess.PIPE,
-                            text=True,
-                        )
-                        _, stderr = mysql.communicate()
-
-                print("✓ Users and grants restored")
+                    print("✓ Users and grants restored")
             except Exception as e:
                 print(f"WARNING: Users restore had errors: {e}")
 
@@ -1228,71 +2576,34 @@ class MariaDBManager:
                 return False
 
             try:
-                # Stop slave if running and reset any existing configuration
-                print("  → Stopping any existing slave processes...")
-                cmd = (
-                    ["mysql"] + self.get_mysql_connection_args() + ["-e", "STOP SLAVE;"]
-                )
-                subprocess.run(cmd, capture_output=True, stdin=subprocess.DEVNULL)
-
-                print("  → Resetting slave configuration...")
-                cmd = (
-                    ["mysql"] + self.get_mysql_connection_args() + ["-e", "RESET SLAVE ALL;"]
-                )
-                subprocess.run(cmd, capture_output=True, stdin=subprocess.DEVNULL)
-
-                # Configure slave
-                print("  → Configuring master connection...")
-                change_master_sql = f"""
-                CHANGE MASTER TO
-                    MASTER_HOST='{master_host}',
-                    MASTER_USER='{master_user}',
-                    MASTER_PASSWORD='{master_password}',
-                    MASTER_PORT={master_port},
-                    MASTER_LOG_FILE='{master_status['binlog_file']}',
-                    MASTER_LOG_POS={master_status['binlog_position']};
-                """
-
-                cmd = (
-                    ["mysql"]
-                    + self.get_mysql_connection_args()
-                    + ["-e", change_master_sql]
-                )
-                result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+                print("  → Stopping and resetting any existing slave configuration...")
+                print("  → Configuring master connection and starting slave...")
+                change_master = {
+                    "host": master_host,
+                    "user": master_user,
+                    "password": master_password,
+                    "port": int(master_port),
+                    "log_file": master_status["binlog_file"],
+                    "log_pos": int(master_status["binlog_position"]),
+                }
+
+                driver_kwargs = self._pymysql_connect_kwargs() if _import_pymysql() else None
+                if driver_kwargs:
+                    ok, output = self._configure_slave_pymysql(driver_kwargs, change_master)
+                else:
+                    ok, output = self._configure_slave_cli(conn_args, change_master)
 
-                if result.returncode != 0:
-                    print(f"ERROR: Failed to configure slave: {result.stderr}")
+                if not ok:
+                    print(f"ERROR: Failed to configure slave: {output}")
                     print("\nTroubleshooting tips:")
                     print("  1. Check MariaDB error log: journalctl -u mariadb -n 50")
                     print("  2. Verify master server is accessible")
                     print("  3. Verify master user has REPLICATION SLAVE privilege")
                     return False
 
-                # Start slave
-                print("  → Starting slave replication...")
-                cmd = (
-                    ["mysql"]
-                    + self.get_mysql_connection_args()
-                    + ["-e", "START SLAVE;"]
-                )
-                result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
-
-                if result.returncode != 0:
-                    print(f"ERROR: Failed to start slave: {result.stderr}")
-                    return False
-
-                # Check slave status
-                print("  → Checking slave status...")
-                cmd = (
-                    ["mysql"]
-                    + self.get_mysql_connection_args()
-                    + ["-e", "SHOW SLAVE STATUS\\G"]
-                )
-                result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
-
                 print("✓ Slave replication configured")
                 print("\nSlave Status:")
-                print(result.stdout)
+                print(output)
 
             except Exception as e:
                 print(f"ERROR: Slave configuration failed: {e}")
@@ -1310,10 +2621,25 @@ class MariaDBManager:
         print(f"\n{'='*60}")
         print("Configuration Settings")
         print(f"{'='*60}")
-        print(f"Config file: {os.path.abspath(self.config_file)}")
+        print(f"Config file: {self._abs_config}")
         print(f"{'='*60}\n")
 
+        # Options 9 and 0 leave the menu and are handled inline
+        handlers = {
+            "1": self._settings_mysql,
+            "2": self._settings_backup_paths,
+            "3": self._settings_backup_options,
+            "4": self._settings_rotation,
+            "5": self._settings_webhooks,
+            "6": self._settings_replication,
+            "7": self._settings_test_connection,
+            "8": self._settings_show,
+        }
+
         while True:
+            # Pick up edits made in the previous iteration
+            self._refresh_settings()
+
             print("\n1. MySQL Connection Settings")
             print("2. Backup Paths")
             print("3. Backup Options")
@@ -1327,184 +2653,8 @@ class MariaDBManager:
 
             choice = input("\nSelect option: ").strip()
 
-            if choice == "1":
-                print("\n--- MySQL Connection Settings ---")
-                host = input(f"Host [{self.config['mysql']['host']}]: ").strip()
-                if host:
-                    self.config.set('mysql', 'host', host)
-                    print(f"  → Set host to: {host}")
-                
-                port = input(f"Port [{self.config['mysql']['port']}]: ").strip()
-                if port:
-                    self.config.set('mysql', 'port', port)
-                    print(f"  → Set port to: {port}")
-                
-                user = input(f"User [{self.config['mysql']['user']}]: ").strip()
-                if user:
-                    self.config.set('mysql', 'user', user)
-                    print(f"  → Set user to: {user}")
-                
-                password = getpass.getpass("Password (leave empty to keep current): ")
-                if password:
-                    self.config.set('mysql', 'password', password)
-                    print(f"  → Password updated")
-                
-                print(f"\n✓ Settings updated in memory (not saved yet)")
-
-
-            elif choice == "2":
-                print("\n--- Backup Paths ---")
-                hourly = input(f"Hourly [{self.config['backup_paths']['hourly']}]: ").strip()
-                if hourly:
-                    self.config.set('backup_paths', 'hourly', hourly)
-                
-                daily = input(f"Daily [{self.config['backup_paths']['daily']}]: ").strip()
-                if daily:
-                    self.config.set('backup_paths', 'daily', daily)
-                
-                monthly = input(f"Monthly [{self.config['backup_paths']['monthly']}]: ").strip()
-                if monthly:
-                    self.config.set('backup_paths', 'monthly', monthly)
-
-            elif choice == "3":
-                print("\n--- Backup Options ---")
-                compression = input(
-                    f"Enable compression (yes/no) [{self.config['options'].get('compression', 'yes')}]: "
-                ).strip()
-                if compression:
-                    self.config.set('options', 'compression', compression)
-
-            elif choice == "4":
-                print("\n--- Backup Rotation Settings ---")
-                print("Set how many backups to keep for each type (0 = unlimited)")
-                
-                hourly = input(f"Hourly backups to keep [{self.config['rotation'].get('hourly_keep', '24')}]: ").strip()
-                if hourly:
-                    self.config.set('rotation', 'hourly_keep', hourly)
-                    print(f"  → Will keep last {hourly} hourly backups")
-                
-                daily = input(f"Daily backups to keep [{self.config['rotation'].get('daily_keep', '31')}]: ").strip()
-                if daily:
-                    self.config.set('rotation', 'daily_keep', daily)
-                    print(f"  → Will keep last {daily} daily backups")
-                
-                monthly = input(f"Monthly backups to keep [{self.config['rotation'].get('monthly_keep', '12')}]: ").strip()
-                if monthly:
-                    self.config.set('rotation', 'monthly_keep', monthly)
-                    print(f"  → Will keep last {monthly} monthly backups")
-                
-                print(f"\n✓ Rotation settings updated in memory (not saved yet)")
-
-            elif choice == "5":
-                print("\n--- Webhook Settings ---")
-                current_success = self.config['webhooks'].get('success_url', '') if self.config.has_section('webhooks') else ''
-                current_failure = self.config['webhooks'].get('failure_url', '') if self.config.has_section('webhooks') else ''
-                success = input(f"Success webhook URL [{current_success}]: ").strip()
-                if success:
-                    if not self.config.has_section('webhooks'):
-                        self.config.add_section('webhooks')
-                    self.config.set('webhooks', 'success_url', success)
-                    print(f"  → Success webhook set")
-                failure = input(f"Failure webhook URL [{current_failure}]: ").strip()
-                if failure:
-                    if not self.config.has_section('webhooks'):
-                        self.config.add_section('webhooks')
-                    self.config.set('webhooks', 'failure_url', failure)
-                    print(f"  → Failure webhook set")
-                print("\n✓ Webhook settings updated in memory (not saved yet)")
-
-            elif choice == "6":
-                print("\n--- Replication Settings (Master for Slave) ---")
-                print("Configure master server details for slave replication.")
-                print("Leave empty if this server is standalone or will be a master.\n")
-                
-                if not self.config.has_section('replication'):
-                    self.config.add_section('replication')
-                
-                current_host = self.config['replication'].get('master_host', '')
-                current_user = self.config['replication'].get('master_user', '')
-                current_pass = self.config['replication'].get('master_password', '')
-                current_port = self.config['replication'].get('master_port', '3306')
-                
-                master_host = input(f"Master Host/IP [{current_host}]: ").strip()
-                if master_host:
-                    self.config.set('replication', 'master_host', master_host)
-                    print(f"  → Master host set to: {master_host}")
-                
-                master_user = input(f"Master Replication User [{current_user}]: ").strip()
-                if master_user:
-                    self.config.set('replication', 'master_user', master_user)
-                    print(f"  → Master user set to: {master_user}")
-                
-                master_pass = getpass.getpass(f"Master Password [{'*' * len(current_pass) if current_pass else 'empty'}]: ")
-                if master_pass:
-                    self.config.set('replication', 'master_password', master_pass)
-                    print(f"  → Master password set")
-                
-                master_port = input(f"Master Port [{current_port}]: ").strip()
-                if master_port:
-                    self.config.set('replication', 'master_port', master_port)
-                    print(f"  → Master port set to: {master_port}")
-                
-                print("\n✓ Replication settings updated in memory (not saved yet)")
-                print("   These will be used when restoring as a slave.")
-
-            elif choice == "7":
-                print("\nTesting MySQL connection...")
-                print(f"  Host: {self.config['mysql']['host']}")
-                print(f"  Port: {self.config['mysql']['port']}")
-                print(f"  User: {self.config['mysql']['user']}")
-                print(f"  Password: {'*' * len(self.config['mysql'].get('password', '')) if self.config['mysql'].get('password') else '(empty)'}")
-                print()
-                if self.test_connection():
-                    print("✓ Connection successful!")
-                else:
-                    print("✗ Connection failed! Check your settings.")
-                    print("\nTip: Test manually with:")
-                    print(f"  mysql --host={self.config['mysql']['host']} --port={self.config['mysql']['port']} --user={self.config['mysql']['user']} -p")
-
-            elif choice == "8":
-                print("\n--- Current Configuration ---")
-                print(f"Config file: {os.path.abspath(self.config_file)}")
-                print(f"File exists: {os.path.exists(self.config_file)}")
-                if os.path.exists(self.config_file):
-                    print(f"File size: {os.path.getsize(self.config_file)} bytes")
-                    mtime = os.path.getmtime(self.config_file)
-                    print(f"Last modified: {datetime.datetime.fromtimestamp(mtime)}")
-                
-                print(f"\n[mysql]")
-                print(f"  host = {self.config['mysql']['host']}")
-                print(f"  port = {self.config['mysql']['port']}")
-                print(f"  user = {self.config['mysql']['user']}")
-                pwd = self.config['mysql'].get('password', '')
-                print(f"  password = {'*' * len(pwd) if pwd else '(empty)'}")
-                print(f"\n[backup_paths]")
-                print(f"  hourly = {self.config['backup_paths']['hourly']}")
-                print(f"  daily = {self.config['backup_paths']['daily']}")
-                print(f"  monthly = {self.config['backup_paths']['monthly']}")
-                print(f"\n[options]")
-                print(f"  compression = {self.config['options'].get('compression', 'yes')}")
-                print(f"\n[rotation]")
-                print(f"  hourly_keep = {self.config['rotation'].get('hourly_keep', '24')}")
-                print(f"  daily_keep = {self.config['rotation'].get('daily_keep', '31')}")
-                print(f"  monthly_keep = {self.config['rotation'].get('monthly_keep', '12')}")
-                if self.config.has_section('replication'):
-                    print(f"\n[replication]")
-                    master_host = self.config['replication'].get('master_host', '')
-                    master_user = self.config['replication'].get('master_user', '')
-                    master_pass = self.config['replication'].get('master_password', '')
-                    master_port = self.config['replication'].get('master_port', '3306')
-                    print(f"  master_host = {master_host if master_host else '(not set)'}")
-                    print(f"  master_user = {master_user if master_user else '(not set)'}")
-                    print(f"  master_password = {'*' * len(master_pass) if master_pass else '(not set)'}")
-                    print(f"  master_port = {master_port}")
-                if self.config.has_section('webhooks'):
-                    print(f"\n[webhooks]")
-                    print(f"  success_url = {self.config['webhooks'].get('success_url', '')}")
-                    print(f"  failure_url = {self.config['webhooks'].get('failure_url', '')}")
-                
-                print(f"\nPress Enter to continue...")
-                input()
+            if choice in handlers:
+                handlers[choice]()
 
             elif choice == "9":
                 if self.save_config():
@@ -1520,6 +2670,228 @@ class MariaDBManager:
                 print("\nExiting without saving.")
                 break
 
+        self._refresh_settings()
+
+    def _settings_mysql(self):
+        """Prompt for MySQL connection settings"""
+        import getpass
+
+        print("\n--- MySQL Connection Settings ---")
+        mysql = self.settings['mysql']
+        host = input(f"Host [{mysql['host']}]: ").strip()
+        if host:
+            self.config.set('mysql', 'host', host)
+            print(f"  → Set host to: {host}")
+
+        port = input(f"Port [{mysql['port']}]: ").strip()
+        if port:
+            self.config.set('mysql', 'port', port)
+            print(f"  → Set port to: {port}")
+
+        user = input(f"User [{mysql['user']}]: ").strip()
+        if user:
+            self.config.set('mysql', 'user', user)
+            print(f"  → Set user to: {user}")
+
+        password = getpass.getpass("Password (leave empty to keep current): ")
+        if password:
+            self.config.set('mysql', 'password', password)
+            print(f"  → Password updated")
+
+        print(f"\n✓ Settings updated in memory (not saved yet)")
+
+    def _settings_backup_paths(self):
+        """Prompt for backup directories"""
+        print("\n--- Backup Paths ---")
+        paths = self.settings['backup_paths']
+        hourly = input(f"Hourly [{paths['hourly']}]: ").strip()
+        if hourly:
+            self.config.set('backup_paths', 'hourly', hourly)
+
+        daily = input(f"Daily [{paths['daily']}]: ").strip()
+        if daily:
+            self.config.set('backup_paths', 'daily', daily)
+
+        monthly = input(f"Monthly [{paths['monthly']}]: ").strip()
+        if monthly:
+            self.config.set('backup_paths', 'monthly', monthly)
+
+    def _settings_backup_options(self):
+        """Prompt for compression, backup method and parallelism"""
+        print("\n--- Backup Options ---")
+        options = self.settings['options']
+        compression = input(
+            f"Enable compression (yes/no) [{options.get('compression', 'yes')}]: "
+        ).strip()
+        if compression:
+            self.config.set('options', 'compression', compression)
+
+        backup_method = input(
+            f"Backup method (logical/mariabackup/tab/mydumper/parallel) [{options.get('backup_method', 'logical')}]: "
+        ).strip()
+        if backup_method:
+            self.config.set('options', 'backup_method', backup_method)
+
+        parallel = input(
+            f"Parallel workers (blank = one per CPU) [{options.get('parallel', '')}]: "
+        ).strip()
+        if parallel:
+            self.config.set('options', 'parallel', parallel)
+
+    def _settings_rotation(self):
+        """Prompt for how many backups of each type to keep"""
+        print("\n--- Backup Rotation Settings ---")
+        rotation = self.settings['rotation']
+        print("Set how many backups to keep for each type (0 = unlimited)")
+
+        hourly = input(f"Hourly backups to keep [{rotation.get('hourly_keep', '24')}]: ").strip()
+        if hourly:
+            self.config.set('rotation', 'hourly_keep', hourly)
+            print(f"  → Will keep last {hourly} hourly backups")
+
+        daily = input(f"Daily backups to keep [{rotation.get('daily_keep', '31')}]: ").strip()
+        if daily:
+            self.config.set('rotation', 'daily_keep', daily)
+            print(f"  → Will keep last {daily} daily backups")
+
+        monthly = input(f"Monthly backups to keep [{rotation.get('monthly_keep', '12')}]: ").strip()
+        if monthly:
+            self.config.set('rotation', 'monthly_keep', monthly)
+            print(f"  → Will keep last {monthly} monthly backups")
+
+        print(f"\n✓ Rotation settings updated in memory (not saved yet)")
+
+    def _settings_webhooks(self):
+        """Prompt for success/failure webhook URLs"""
+        print("\n--- Webhook Settings ---")
+        webhooks = self.settings.get('webhooks', {})
+        current_success = webhooks.get('success_url', '')
+        current_failure = webhooks.get('failure_url', '')
+        success = input(f"Success webhook URL [{current_success}]: ").strip()
+        if success:
+            if not self.config.has_section('webhooks'):
+                self.config.add_section('webhooks')
+            self.config.set('webhooks', 'success_url', success)
+            print(f"  → Success webhook set")
+        failure = input(f"Failure webhook URL [{current_failure}]: ").strip()
+        if failure:
+            if not self.config.has_section('webhooks'):
+                self.config.add_section('webhooks')
+            self.config.set('webhooks', 'failure_url', failure)
+            print(f"  → Failure webhook set")
+        print("\n✓ Webhook settings updated in memory (not saved yet)")
+
+    def _settings_replication(self):
+        """Prompt for the master used when restoring as a slave"""
+        import getpass
+
+        print("\n--- Replication Settings (Master for Slave) ---")
+        print("Configure master server details for slave replication.")
+        print("Leave empty if this server is standalone or will be a master.\n")
+
+        if not self.config.has_section('replication'):
+            self.config.add_section('replication')
+        replication = self.settings.get('replication', {})
+
+        current_host = replication.get('master_host', '')
+        current_user = replication.get('master_user', '')
+        current_pass = replication.get('master_password', '')
+        current_port = replication.get('master_port', '3306')
+
+        master_host = input(f"Master Host/IP [{current_host}]: ").strip()
+        if master_host:
+            self.config.set('replication', 'master_host', master_host)
+            print(f"  → Master host set to: {master_host}")
+
+        master_user = input(f"Master Replication User [{current_user}]: ").strip()
+        if master_user:
+            self.config.set('replication', 'master_user', master_user)
+            print(f"  → Master user set to: {master_user}")
+
+        master_pass = getpass.getpass(f"Master Password [{'*' * len(current_pass) if current_pass else 'empty'}]: ")
+        if master_pass:
+            self.config.set('replication', 'master_password', master_pass)
+            print(f"  → Master password set")
+
+        master_port = input(f"Master Port [{current_port}]: ").strip()
+        if master_port:
+            self.config.set('replication', 'master_port', master_port)
+            print(f"  → Master port set to: {master_port}")
+
+        print("\n✓ Replication settings updated in memory (not saved yet)")
+        print("   These will be used when restoring as a slave.")
+
+    def _settings_test_connection(self):
+        """Show the connection settings and test them"""
+        print("\nTesting MySQL connection...")
+        mysql = self.settings['mysql']
+        print(f"  Host: {mysql['host']}")
+        print(f"  Port: {mysql['port']}")
+        print(f"  User: {mysql['user']}")
+        print(f"  Password: {'*' * len(mysql.get('password', '')) if mysql.get('password') else '(empty)'}")
+        print()
+        if self.test_connection():
+            print("✓ Connection successful!")
+        else:
+            print("✗ Connection failed! Check your settings.")
+            print("\nTip: Test manually with:")
+            print(f"  mysql --host={mysql['host']} --port={mysql['port']} --user={mysql['user']} -p")
+
+    def _settings_show(self):
+        """Print the current configuration"""
+        print("\n--- Current Configuration ---")
+        mysql = self.settings['mysql']
+        paths = self.settings['backup_paths']
+        options = self.settings['options']
+        rotation = self.settings['rotation']
+        print(f"Config file: {self._abs_config}")
+        try:
+            st = os.stat(self.config_file)
+        except FileNotFoundError:
+            st = None
+        print(f"File exists: {st is not None}")
+        if st is not None:
+            print(f"File size: {st.st_size} bytes")
+            print(f"Last modified: {datetime.datetime.fromtimestamp(st.st_mtime)}")
+
+        print(f"\n[mysql]")
+        print(f"  host = {mysql['host']}")
+        print(f"  port = {mysql['port']}")
+        print(f"  user = {mysql['user']}")
+        pwd = mysql.get('password', '')
+        print(f"  password = {'*' * len(pwd) if pwd else '(empty)'}")
+        print(f"\n[backup_paths]")
+        print(f"  hourly = {paths['hourly']}")
+        print(f"  daily = {paths['daily']}")
+        print(f"  monthly = {paths['monthly']}")
+        print(f"\n[options]")
+        print(f"  compression = {options.get('compression', 'yes')}")
+        print(f"  backup_method = {options.get('backup_method', 'logical')}")
+        print(f"  parallel = {options.get('parallel', '(one per CPU)')}")
+        print(f"\n[rotation]")
+        print(f"  hourly_keep = {rotation.get('hourly_keep', '24')}")
+        print(f"  daily_keep = {rotation.get('daily_keep', '31')}")
+        print(f"  monthly_keep = {rotation.get('monthly_keep', '12')}")
+        if 'replication' in self.settings:
+            replication = self.settings['replication']
+            print(f"\n[replication]")
+            master_host = replication.get('master_host', '')
+            master_user = replication.get('master_user', '')
+            master_pass = replication.get('master_password', '')
+            master_port = replication.get('master_port', '3306')
+            print(f"  master_host = {master_host if master_host else '(not set)'}")
+            print(f"  master_user = {master_user if master_user else '(not set)'}")
+            print(f"  master_password = {'*' * len(master_pass) if master_pass else '(not set)'}")
+            print(f"  master_port = {master_port}")
+        if 'webhooks' in self.settings:
+            webhooks = self.settings['webhooks']
+            print(f"\n[webhooks]")
+            print(f"  success_url = {webhooks.get('success_url', '')}")
+            print(f"  failure_url = {webhooks.get('failure_url', '')}")
+
+        print(f"\nPress Enter to continue...")
+        input()
+
     def manage_schedule(self):
         """Manage automated backup schedule (cron)"""
         print(f"\n{'='*60}")
@@ -1528,21 +2900,18 @@ class MariaDBManager:
         
         # Get current crontab
         try:
-            result = subprocess.run(['crontab', '-l'], capture_output=True, text=True)
+            result = subprocess.run(['crontab', '-l'], capture_output=True, text=True, timeout=10)
             current_cron = result.stdout if result.returncode == 0 else ""
         except Exception as e:
             print(f"ERROR: Could not read crontab: {e}")
             return
         
         # Check for existing MariaDB backup entries
-        mariadb_entries = []
-        other_entries = []
-        
-        for line in current_cron.split('\n'):
-            if 'mariadb_manager.py' in line or 'MariaDB' in line:
-                mariadb_entries.append(line)
-            elif line.strip():
-                other_entries.append(line)
+        cron_lines = current_cron.splitlines()
+        mariadb_entries = [line for line in cron_lines if _MDB_CRON_RE.search(line)]
+        other_entries = [
+            line for line in cron_lines if line.strip() and not _MDB_CRON_RE.search(line)
+        ]
         
         if mariadb_entries:
             print("Current MariaDB backup schedule:")
@@ -1563,306 +2932,307 @@ class MariaDBManager:
         
         choice = input("\nSelect option: ").strip()
         
-        if choice == "1":
-            print("\nSelect backup schedule:")
-            print("  1. Hourly + Daily + Monthly (recommended)")
-            print("  2. Daily only")
-            print("  3. Daily + Monthly")
-            print("  4. Custom")
-            
-            schedule_choice = input("\nOption (1-4): ").strip()
-            
-            script_path = os.path.abspath(sys.argv[0])
-            config_path = os.path.abspath(self.config_file)
-            
-            new_entries = []
-            
-            if schedule_choice == "1":
-                new_entries = [
+        handlers = {
+            "1": lambda: self._schedule_add(other_entries),
+            "2": lambda: self._schedule_remove(mariadb_entries, other_entries),
+            "3": lambda: self._schedule_show(current_cron),
+        }
+        handler = handlers.get(choice)
+        if handler:
+            handler()
+
+    def _schedule_add(self, other_entries):
+        """Replace this tool's cron entries with a chosen schedule"""
+        print("\nSelect backup schedule:")
+        print("  1. Hourly + Daily + Monthly (recommended)")
+        print("  2. Daily only")
+        print("  3. Daily + Monthly")
+        print("  4. Custom")
+
+        schedule_choice = input("\nOption (1-4): ").strip()
+
+        def cron_line(sched, kind):
+            return _CRON_LINE.format(
+                sched=sched, script=self._abs_script, kind=kind, cfg=self._abs_config
+            )
+
+        new_entries = []
+
+        if schedule_choice == "1":
+            new_entries = [
+                "# MariaDB Hourly Backup",
+                cron_line("0 * * * *", "hourly"),
+                "",
+                "# MariaDB Daily Backup (2 AM)",
+                cron_line("0 2 * * *", "daily"),
+                "",
+                "# MariaDB Monthly Backup (1st of month, 3 AM)",
+                cron_line("0 3 1 * *", "monthly")
+            ]
+        elif schedule_choice == "2":
+            new_entries = [
+                "# MariaDB Daily Backup (2 AM)",
+                cron_line("0 2 * * *", "daily")
+            ]
+        elif schedule_choice == "3":
+            new_entries = [
+                "# MariaDB Daily Backup (2 AM)",
+                cron_line("0 2 * * *", "daily"),
+                "",
+                "# MariaDB Monthly Backup (1st of month, 3 AM)",
+                cron_line("0 3 1 * *", "monthly")
+            ]
+        elif schedule_choice == "4":
+            print("\nCustom schedule:")
+            print("Enter cron schedule (e.g., '0 2 * * *' for daily at 2 AM)")
+            print("Leave empty to skip each type")
+            print()
+
+            hourly_sched = input("Hourly schedule (e.g., '0 * * * *'): ").strip()
+            if hourly_sched:
+                new_entries.extend([
                     "# MariaDB Hourly Backup",
-                    f"0 * * * * {script_path} --backup hourly --config {config_path} >> /var/log/mariadb_backup.log 2>&1",
-                    "",
-                    "# MariaDB Daily Backup (2 AM)",
-                    f"0 2 * * * {script_path} --backup daily --config {config_path} >> /var/log/mariadb_backup.log 2>&1",
-                    "",
-                    "# MariaDB Monthly Backup (1st of month, 3 AM)",
-                    f"0 3 1 * * {script_path} --backup monthly --config {config_path} >> /var/log/mariadb_backup.log 2>&1"
-                ]
-            elif schedule_choice == "2":
-                new_entries = [
-                    "# MariaDB Daily Backup (2 AM)",
-                    f"0 2 * * * {script_path} --backup daily --config {config_path} >> /var/log/mariadb_backup.log 2>&1"
-                ]
-            elif schedule_choice == "3":
-                new_entries = [
-                    "# MariaDB Daily Backup (2 AM)",
-                    f"0 2 * * * {script_path} --backup daily --config {config_path} >> /var/log/mariadb_backup.log 2>&1",
-                    "",
-                    "# MariaDB Monthly Backup (1st of month, 3 AM)",
-                    f"0 3 1 * * {script_path} --backup monthly --config {config_path} >> /var/log/mariadb_backup.log 2>&1"
-                ]
-            elif schedule_choice == "4":
-                print("\nCustom schedule:")
-                print("Enter cron schedule (e.g., '0 2 * * *' for daily at 2 AM)")
-                print("Leave empty to skip each type")
-                print()
-                
-                hourly_sched = input("Hourly schedule (e.g., '0 * * * *'): ").strip()
-                if hourly_sched:
-                    new_entries.extend([
-                        "# MariaDB Hourly Backup",
-                        f"{hourly_sched} {script_path} --backup hourly --config {config_path} >> /var/log/mariadb_backup.log 2>&1",
-                        ""
-                    ])
-                
-                daily_sched = input("Daily schedule (e.g., '0 2 * * *'): ").strip()
-                if daily_sched:
-                    new_entries.extend([
-                        "# MariaDB Daily Backup",
-                        f"{daily_sched} {script_path} --backup daily --config {config_path} >> /var/log/mariadb_backup.log 2>&1",
-                        ""
-                    ])
-                
-                monthly_sched = input("Monthly schedule (e.g., '0 3 1 * *'): ").strip()
-                if monthly_sched:
-                    new_entries.extend([
-                        "# MariaDB Monthly Backup",
-                        f"{monthly_sched} {script_path} --backup monthly --config {config_path} >> /var/log/mariadb_backup.log 2>&1"
-                    ])
-            else:
-                print("Invalid option")
-                return
-            
-            if new_entries:
-                print("\n" + "="*60)
-                print("New schedule to be added:")
-                print("-" * 60)
-                for entry in new_entries:
-                    print(entry)
-                print("-" * 60)
-                
-                confirm = input("\nApply this schedule? (yes/no): ").strip().lower()
-                
-                if confirm == "yes":
-                    # Build new crontab: other entries + new MariaDB entries
-                    new_cron_lines = other_entries + [''] + new_entries
-                    new_cron = '\n'.join(new_cron_lines) + '\n'
-                    
-                    try:
-                        proc = subprocess.Popen(['crontab', '-'], stdin=subprocess.PIPE, text=True)
-                        proc.communicate(input=new_cron)
-                        
-                        if proc.returncode == 0:
-                            print("\n✓ Schedule updated successfully!")
-                            print("\nView schedule with: crontab -l")
-                            print("View logs with: tail -f /var/log/mariadb_backup.log")
-                        else:
-                            print("\n✗ Failed to update crontab")
-                    except Exception as e:
-                        print(f"\n✗ Error updating crontab: {e}")
-                else:
-                    print("\nCancelled.")
-        
-        elif choice == "2":
-            if not mariadb_entries:
-                print("\nNo MariaDB backup schedules to remove.")
-                return
-            
-            confirm = input("\nRemove all MariaDB backup schedules? (yes/no): ").strip().lower()
-            
+                    cron_line(hourly_sched, "hourly"),
+                    ""
+                ])
+
+            daily_sched = input("Daily schedule (e.g., '0 2 * * *'): ").strip()
+            if daily_sched:
+                new_entries.extend([
+                    "# MariaDB Daily Backup",
+                    cron_line(daily_sched, "daily"),
+                    ""
+                ])
+
+            monthly_sched = input("Monthly schedule (e.g., '0 3 1 * *'): ").strip()
+            if monthly_sched:
+                new_entries.extend([
+                    "# MariaDB Monthly Backup",
+                    cron_line(monthly_sched, "monthly")
+                ])
+        else:
+            print("Invalid option")
+            return
+
+        if new_entries:
+            print("\n" + "="*60)
+            print("New schedule to be added:")
+            print("-" * 60)
+            for entry in new_entries:
+                print(entry)
+            print("-" * 60)
+
+            confirm = input("\nApply this schedule? (yes/no): ").strip().lower()
+
             if confirm == "yes":
-                # Keep only non-MariaDB entries
-                new_cron = '\n'.join(other_entries) + '\n' if other_entries else ''
-                
+                # Build new crontab: other entries + new MariaDB entries
+                new_cron_lines = other_entries + [''] + new_entries
+                new_cron = '\n'.join(new_cron_lines) + '\n'
+
                 try:
-                    proc = subprocess.Popen(['crontab', '-'], stdin=subprocess.PIPE, text=True)
-                    proc.communicate(input=new_cron)
-                    
-                    if proc.returncode == 0:
-                        print("\n✓ All MariaDB backup schedules removed")
+                    result = subprocess.run(
+                        ['crontab', '-'], input=new_cron, text=True, timeout=10, capture_output=True
+                    )
+
+                    if result.returncode == 0:
+                        print("\n✓ Schedule updated successfully!")
+                        print("\nView schedule with: crontab -l")
+                        print("View logs with: tail -f /var/log/mariadb_backup.log")
                     else:
-                        print("\n✗ Failed to update crontab")
+                        print(f"\n✗ Failed to update crontab: {result.stderr.strip()}")
                 except Exception as e:
                     print(f"\n✗ Error updating crontab: {e}")
             else:
                 print("\nCancelled.")
-        
-        elif choice == "3":
-            print("\nFull crontab:")
-            print("=" * 60)
-            print(current_cron if current_cron else "(empty)")
-            print("=" * 60)
-            input("\nPress Enter to continue...")
+
+    def _schedule_remove(self, mariadb_entries, other_entries):
+        """Remove this tool's cron entries, keeping everything else"""
+        if not mariadb_entries:
+            print("\nNo MariaDB backup schedules to remove.")
+            return
+
+        confirm = input("\nRemove all MariaDB backup schedules? (yes/no): ").strip().lower()
+
+        if confirm == "yes":
+            # Keep only non-MariaDB entries
+            new_cron = '\n'.join(other_entries) + '\n' if other_entries else ''
+
+            try:
+                result = subprocess.run(
+                    ['crontab', '-'], input=new_cron, text=True, timeout=10, capture_output=True
+                )
+
+                if result.returncode == 0:
+                    print("\n✓ All MariaDB backup schedules removed")
+                else:
+                    print(f"\n✗ Failed to update crontab: {result.stderr.strip()}")
+            except Exception as e:
+                print(f"\n✗ Error updating crontab: {e}")
+        else:
+            print("\nCancelled.")
+
+    def _schedule_show(self, current_cron):
+        """Print the whole crontab"""
+        print("\nFull crontab:")
+        print("=" * 60)
+        print(current_cron if current_cron else "(empty)")
+        print("=" * 60)
+        input("\nPress Enter to continue...")
 
     def interactive_menu(self):
         """Main interactive menu"""
+        menu_text = "\n".join([
+            f"\n{'='*60}",
+            "MariaDB Backup & Restore Manager",
+            f"{'='*60}",
+            f"Config: {self._abs_config}",
+            f"{'='*60}",
+            "\nBACKUP OPTIONS:",
+            "  1. Create Hourly Backup",
+            "  2. Create Daily Backup",
+            "  3. Create Monthly Backup",
+            "  4. Create Manual Backup",
+            "\nRESTORE OPTIONS:",
+            "  5. List Available Backups",
+            "  6. Restore Backup (Standalone/Master)",
+            "  7. Restore Backup as Slave (with replication)",
+            "\nSETTINGS:",
+            "  8. Configure Settings",
+            "  9. Test MySQL Connection",
+            " 10. Manage Backup Schedule (cron)",
+            "\n  0. Exit",
+        ])
+
         while True:
-            print(f"\n{'='*60}")
-            print("MariaDB Backup & Restore Manager")
-            print(f"{'='*60}")
-            print(f"Config: {os.path.abspath(self.config_file)}")
-            print(f"{'='*60}")
-            print("\nBACKUP OPTIONS:")
-            print("  1. Create Hourly Backup")
-            print("  2. Create Daily Backup")
-            print("  3. Create Monthly Backup")
-            print("  4. Create Manual Backup")
-            print("\nRESTORE OPTIONS:")
-            print("  5. List Available Backups")
-            print("  6. Restore Backup (Standalone/Master)")
-            print("  7. Restore Backup as Slave (with replication)")
-            print("\nSETTINGS:")
-            print("  8. Configure Settings")
-            print("  9. Test MySQL Connection")
-            print(" 10. Manage Backup Schedule (cron)")
-            print("\n  0. Exit")
+            print(menu_text)
 
             choice = input("\nSelect option: ").strip()
 
-            if choice == "1":
-                self.backup_databases("hourly")
-            elif choice == "2":
-                self.backup_databases("daily")
-            elif choice == "3":
-                self.backup_databases("monthly")
-            elif choice == "4":
-                backup_path = input(
-                    "Enter backup path (or press Enter for default): "
-                ).strip()
-                self.backup_databases("manual", backup_path if backup_path else None)
-
-            elif choice == "5":
-                # Prompt for backup type
-                print("\nSelect backup type:")
-                print("  1. Hourly")
-                print("  2. Daily")
-                print("  3. Monthly")
-                print("  4. All")
-                type_choice = input("\nSelect type: ").strip()
-                
-                type_map = {"1": "hourly", "2": "daily", "3": "monthly", "4": None}
-                backup_type = type_map.get(type_choice)
-                
-                if type_choice in type_map:
-                    self.list_backups(backup_type)
-                else:
-                    print("Invalid selection")
-
-            elif choice == "6":
-                # Prompt for backup type
-                print("\nSelect backup type:")
-                print("  1. Hourly")
-                print("  2. Daily")
-                print("  3. Monthly")
-                print("  4. All")
-                type_choice = input("\nSelect type: ").strip()
-                
-                type_map = {"1": "hourly", "2": "daily", "3": "monthly", "4": None}
-                backup_type = type_map.get(type_choice)
-                
-                if type_choice in type_map:
-                    backups = self.list_backups(backup_type)
-                    if backups:
-                        try:
-                            idx = int(input("\nEnter backup number to restore: ")) - 1
-                            if 0 <= idx < len(backups):
-                                self.restore_backup(backups[idx]["path"])
-                            else:
-                                print("Invalid backup number")
-                        except ValueError:
-                            print("Invalid input")
-                else:
-                    print("Invalid selection")
-
-            elif choice == "7":
-                # Prompt for backup type
-                print("\nSelect backup type:")
-                print("  1. Hourly")
-                print("  2. Daily")
-                print("  3. Monthly")
-                print("  4. All")
-                type_choice = input("\nSelect type: ").strip()
-                
-                type_map = {"1": "hourly", "2": "daily", "3": "monthly", "4": None}
-                backup_type = type_map.get(type_choice)
-                
-                if type_choice in type_map:
-                    backups = self.list_backups(backup_type)
-                    if backups:
-                        try:
-                            idx = int(input("\nEnter backup number to restore: ")) - 1
-                            if 0 <= idx < len(backups):
-                                # Check if config has replication settings
-                                has_config = self.config.has_section('replication')
-                                config_host = self.config['replication'].get('master_host', '') if has_config else ''
-                                config_user = self.config['replication'].get('master_user', '') if has_config else ''
-                                config_pass = self.config['replication'].get('master_password', '') if has_config else ''
-                                config_port = self.config['replication'].get('master_port', '3306') if has_config else '3306'
-                                
-                                if config_host and config_user and config_pass:
-                                    print("\n📋 Found saved replication settings in config:")
-                                    print(f"   Master: {config_host}:{config_port}")
-                                    print(f"   User: {config_user}")
-                                    use_config = input("\nUse saved settings? (yes/no) [yes]: ").strip().lower()
-                                    
-                                    if use_config in ['', 'y', 'yes']:
-                                        # Use config settings
-                                        master_host = None
-                                        master_user = None
-                                        master_password = None
-                                        master_port = None
-                                    else:
-                                        # Prompt for manual input
-                                        master_host = input(f"Master host/IP [{config_host}]: ").strip() or None
-                                        master_user = input(f"Master replication user [{config_user}]: ").strip() or None
-                                        master_password = getpass.getpass("Master replication password: ") or None
-                                        master_port = input(f"Master port [{config_port}]: ").strip() or None
-                                else:
-                                    # No config or incomplete config, prompt for input
-                                    print("\n⚠️  No saved replication settings found in config.")
-                                    print("   You can configure these in Settings menu (option 8).\n")
-                                    master_host = input("Master host/IP: ").strip() or None
-                                    master_user = input("Master replication user: ").strip() or None
-                                    master_password = getpass.getpass("Master replication password: ") or None
-                                    master_port = input("Master port [3306]: ").strip() or None
-
-                                self.restore_backup(
-                                    backups[idx]["path"],
-                                    restore_as_slave=True,
-                                    master_host=master_host,
-                                    master_user=master_user,
-                                    master_password=master_password,
-                                    master_port=master_port,
-                                )
-                            else:
-                                print("Invalid backup number")
-                        except ValueError:
-                            print("Invalid input")
-                else:
-                    print("Invalid selection")
+            if choice == "0":
+                print("\nExiting...")
+                break
 
-            elif choice == "8":
-                self.configure_settings()
+            self._menu.get(choice, self._menu_invalid)()
 
-            elif choice == "9":
-                print("\nTesting MySQL connection...")
-                if self.test_connection():
-                    print("✓ Connection successful!")
-                else:
-                    print("✗ Connection failed! Check your settings.")
+    def _menu_invalid(self):
+        print("Invalid option")
 
-            elif choice == "10":
-                self.manage_schedule()
+    def _menu_manual_backup(self):
+        """Create a manual backup in a chosen or the default path"""
+        backup_path = input(
+            "Enter backup path (or press Enter for default): "
+        ).strip()
+        self.backup_databases("manual", backup_path if backup_path else None)
 
-            elif choice == "0":
-                print("\nExiting...")
-                break
+    def _prompt_backup_type(self):
+        """Ask which backup type to list
 
-            else:
-                print("Invalid option")
+        Returns:
+            (valid selection, backup type or None for all types)
+        """
+        print("\nSelect backup type:")
+        print("  1. Hourly")
+        print("  2. Daily")
+        print("  3. Monthly")
+        print("  4. All")
+        type_choice = input("\nSelect type: ").strip()
+
+        type_map = {"1": "hourly", "2": "daily", "3": "monthly", "4": None}
+        if type_choice not in type_map:
+            print("Invalid selection")
+            return False, None
+        return True, type_map[type_choice]
+
+    def _select_backup(self):
+        """List backups of a chosen type and ask which one to restore
+
+        Returns:
+            The selected backup record from list_backups(), or None
+        """
+        valid, backup_type = self._prompt_backup_type()
+        if not valid:
+            return None
 
+        backups = self.list_backups(backup_type)
+        if not backups:
+            return None
+        try:
+            idx = int(input("\nEnter backup number to restore: ")) - 1
+        except ValueError:
+            print("Invalid input")
+            return None
+        if not 0 <= idx < len(backups):
+            print("Invalid backup number")
+            return None
+        return backups[idx]
+
+    def _menu_list_backups(self):
+        """List backups of a chosen type"""
+        valid, backup_type = self._prompt_backup_type()
+        if valid:
+            self.list_backups(backup_type)
+
+    def _menu_restore(self):
+        """Restore a chosen backup as a standalone/master server"""
+        backup = self._select_backup()
+        if backup:
+            self.restore_backup(backup["path"])
+
+    def _menu_restore_as_slave(self):
+        """Restore a chosen backup and configure replication"""
+        backup = self._select_backup()
+        if not backup:
+            return
+
+        # Check if config has replication settings
+        replication = self.settings.get('replication', {})
+        config_host = replication.get('master_host', '')
+        config_user = replication.get('master_user', '')
+        config_pass = replication.get('master_password', '')
+        config_port = replication.get('master_port', '3306')
+
+        if config_host and config_user and config_pass:
+            print("\n📋 Found saved replication settings in config:")
+            print(f"   Master: {config_host}:{config_port}")
+            print(f"   User: {config_user}")
+            use_config = input("\nUse saved settings? (yes/no) [yes]: ").strip().lower()
+        else:
+            # No config or incomplete config, prompt for input
+            print("\n⚠️  No saved replication settings found in config.")
+            print("   You can configure these in Settings menu (option 8).\n")
+            use_config = "no"
+
+        if use_config in ['', 'y', 'yes']:
+            # restore_backup falls back to the config for unset values
+            master_host = master_user = master_password = master_port = None
+        else:
+            master_host = _ask("Master host/IP", config_host)
+            master_user = _ask("Master replication user", config_user)
+            master_password = _ask_secret("Master replication password")
+            master_port = _ask("Master port", config_port)
+
+        self.restore_backup(
+            backup["path"],
+            restore_as_slave=True,
+            master_host=master_host,
+            master_user=master_user,
+            master_password=master_password,
+            master_port=master_port,
+        )
+
+    def _menu_test_connection(self):
+        print("\nTesting MySQL connection...")
+        if self.test_connection():
+            print("✓ Connection successful!")
+        else:
+            print("✗ Connection failed! Check your settings.")
+
+
+def parse_args():
+    """Parse command line arguments"""
+    # Imported here: the interactive menu and module imports never need it
+    import argparse
 
-def main():
     parser = argparse.ArgumentParser(
         description="MariaDB Backup and Restore Manager",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1876,11 +3246,15 @@ Examples:
   %(prog)s --backup daily
   %(prog)s --backup monthly
   %(prog)s --backup manual --path /custom/path
+  %(prog)s --backup manual --databases shop,blog
   
   # List backups
   %(prog)s --list
   %(prog)s --list --type daily
   
+  # Check a backup against its SHA256SUMS
+  %(prog)s --verify /path/to/backup
+  
   # Restore as master/standalone
   %(prog)s --restore /path/to/backup
   
@@ -1910,6 +3284,11 @@ Examples:
         help="Create backup",
     )
     parser.add_argument("--path", "-p", help="Custom backup path (for manual backup)")
+    parser.add_argument(
+        "--databases",
+        "-d",
+        help="Comma-separated databases to back up (with --backup; default: all)",
+    )
     parser.add_argument(
         "--list", "-l", action="store_true", help="List available backups"
     )
@@ -1922,6 +3301,9 @@ Examples:
     parser.add_argument(
         "--restore", "-r", metavar="PATH", help="Restore backup from path"
     )
+    parser.add_argument(
+        "--verify", metavar="PATH", help="Verify a backup against its checksums"
+    )
     parser.add_argument(
         "--slave", "-s", action="store_true", help="Configure as slave (with --restore)"
     )
@@ -1930,39 +3312,102 @@ Examples:
     parser.add_argument("--master-password", help="Master replication password")
     parser.add_argument("--master-port", help="Master port for slave setup (default: 3306)")
 
-    args = parser.parse_args()
+    return parser.parse_args()
 
-    # Create manager instance
-    manager = MariaDBManager(args.config)
-
-    # Handle command line mode
-    if args.backup:
-        success = manager.backup_databases(args.backup, args.path)
-        sys.exit(0 if success else 1)
-
-    elif args.list:
-        manager.list_backups(args.type)
-        sys.exit(0)
-
-    elif args.restore:
-        success = manager.restore_backup(
-            args.restore,
-            restore_as_slave=args.slave,
-            master_host=args.master_host,
-            master_user=args.master_user,
-            master_password=args.master_password,
-            master_port=args.master_port if hasattr(args, 'master_port') else None,
-        )
-        sys.exit(0 if success else 1)
 
-    else:
-        # Interactive menu mode
+def parse_backup_args(argv):
+    """Parse the scheduled-backup command line without argparse
+
+    Handles exactly what cron entries pass: --backup TYPE plus optional
+    --path and --config, each as a separate value. Anything else (help,
+    other flags, --opt=value forms, repeats) returns None so the full
+    parser reports it.
+
+    Returns:
+        (backup type, path or None, config or None), or None
+    """
+    if len(argv) not in (2, 4, 6):
+        return None
+
+    names = {"--backup": "backup", "-b": "backup", "--path": "path",
+             "-p": "path", "--config": "config", "-c": "config"}
+    values = {}
+    for flag, value in zip(argv[::2], argv[1::2]):
+        name = names.get(flag)
+        if name is None or name in values or value.startswith("-"):
+            return None
+        values[name] = value
+
+    if values.get("backup") not in ("hourly", "daily", "monthly", "manual"):
+        return None
+    return values["backup"], values.get("path"), values.get("config")
+
+
+def main():
+    # Scheduled backups skip building the argparse grammar
+    backup_args = parse_backup_args(sys.argv[1:])
+    if backup_args is not None:
+        backup_type, path, config = backup_args
+        manager = MariaDBManager(config)
         try:
-            manager.interactive_menu()
-        except KeyboardInterrupt:
-            print("\n\nInterrupted by user")
+            success = manager.backup_databases(backup_type, path)
+            sys.exit(0 if success else 1)
+        finally:
+            manager.close_mysql_session()
+
+    # A bare invocation opens the interactive menu, so skip building the
+    # argparse grammar entirely
+    args = parse_args() if len(sys.argv) > 1 else None
+
+    # Create manager instance
+    manager = MariaDBManager(args.config if args else None)
+
+    try:
+        # Handle command line mode
+        if args is None or not (args.backup or args.list or args.restore or args.verify):
+            # Interactive menu mode
+            try:
+                manager.interactive_menu()
+            except KeyboardInterrupt:
+                print("\n\nInterrupted by user")
+                sys.exit(0)
+
+        elif args.backup:
+            databases = (
+                [db.strip() for db in args.databases.split(",") if db.strip()]
+                if args.databases
+                else None
+            )
+            success = manager.backup_databases(args.backup, args.path, databases)
+            sys.exit(0 if success else 1)
+
+        elif args.list:
+            manager.list_backups(args.type)
             sys.exit(0)
 
+        elif args.verify:
+            ok, problems = manager.verify_backup(args.verify)
+            if ok is None:
+                print(f"No {manager.CHECKSUM_FILE} in {args.verify} (enable checksums = yes)")
+                sys.exit(1)
+            for problem in problems:
+                print(f"✗ {problem}")
+            print("✓ All checksums match" if ok else "✗ Backup failed verification")
+            sys.exit(0 if ok else 1)
+
+        elif args.restore:
+            success = manager.restore_backup(
+                args.restore,
+                restore_as_slave=args.slave,
+                master_host=args.master_host,
+                master_user=args.master_user,
+                master_password=args.master_password,
+                master_port=args.master_port if hasattr(args, 'master_port') else None,
+            )
+            sys.exit(0 if success else 1)
+    finally:
+        manager.close_mysql_session()
+
 
 if __name__ == "__main__":
     main()
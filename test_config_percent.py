@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+"""
+Test that config values containing % load as written
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mariadb_manager import MariaDBManager
+
+config_file = 'test_config_percent.conf'
+
+print("Testing config values with % characters...\n")
+
+with open(config_file, 'w') as f:
+    f.write("""[mysql]
+host = localhost
+user = root
+password = p%ss%%word
+port = 3306
+
+[webhooks]
+success_url = https://example.com/hook?msg=backup%20done
+failure_url = https://example.com/hook?msg=backup%%20failed
+""")
+
+try:
+    manager = MariaDBManager(config_file)
+finally:
+    os.remove(config_file)
+
+print(f"✓ Loaded {config_file}\n")
+
+expected = {
+    ('mysql', 'password'): 'p%ss%%word',
+    ('webhooks', 'success_url'): 'https://example.com/hook?msg=backup%20done',
+    # Valid %% escapes still interpolate to a single %
+    ('webhooks', 'failure_url'): 'https://example.com/hook?msg=backup%20failed',
+}
+
+failed = False
+for (section, key), value in expected.items():
+    got = manager.settings[section][key]
+    if got == value:
+        print(f"✓ {section}.{key}: {got}")
+    else:
+        print(f"✗ {section}.{key}: expected {value!r}, got {got!r}")
+        failed = True
+
+if failed:
+    print("\n❌ % values were not loaded as written")
+    sys.exit(1)
+print("\n✓ All values match!")
@@ -12,8 +12,6 @@ Test that exactly simulates user workflow:
 
 import os
 import sys
-import subprocess
-import time
 
 # Clean up any existing test config
 test_config = 'test_user_workflow.conf'
@@ -24,52 +22,38 @@ print("=" * 60)
 print("Simulating exact user workflow")
 print("=" * 60)
 
-# Step 1: Create a Python script that will modify and save config
-test_script = """
-import sys
-sys.path.insert(0, '.')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mariadb_manager
 from mariadb_manager import MariaDBManager
 
-print("\\nStep 1: Creating manager instance")
-manager = MariaDBManager('test_user_workflow.conf')
+print("\n" + "=" * 60)
+print("FIRST RUN: Creating and modifying config")
+print("=" * 60)
 
-print("\\nStep 2: Current values:")
+print("\nStep 1: Creating manager instance")
+manager = MariaDBManager(test_config)
+
+print("\nStep 2: Current values:")
 print(f"  host: {manager.config['mysql']['host']}")
 print(f"  user: {manager.config['mysql']['user']}")
 print(f"  password: {manager.config['mysql']['password']}")
 
-print("\\nStep 3: Modifying values")
+print("\nStep 3: Modifying values")
 manager.config.set('mysql', 'host', 'modified_host')
 manager.config.set('mysql', 'user', 'modified_user')
 manager.config.set('mysql', 'password', 'modified_password')
 
-print("\\nStep 4: Values after modification:")
+print("\nStep 4: Values after modification:")
 print(f"  host: {manager.config['mysql']['host']}")
 print(f"  user: {manager.config['mysql']['user']}")
 print(f"  password: {manager.config['mysql']['password']}")
 
-print("\\nStep 5: Saving config")
+print("\nStep 5: Saving config")
 result = manager.save_config()
 print(f"Save result: {result}")
 
-print("\\nStep 6: Exiting (simulating script end)")
-"""
-
-# Write and run the test script
-with open('_test_modify.py', 'w') as f:
-    f.write(test_script)
-
-print("\n" + "=" * 60)
-print("FIRST RUN: Creating and modifying config")
-print("=" * 60)
-result = subprocess.run([sys.executable, '_test_modify.py'], cwd=os.getcwd())
-
-if result.returncode != 0:
-    print("\n❌ First run failed!")
-    sys.exit(1)
-
-# Give filesystem time to sync
-time.sleep(0.5)
+print("\nStep 6: Exiting (simulating script end)")
+del manager
 
 # Now verify the file
 print("\n" + "=" * 60)
@@ -91,16 +75,18 @@ with open(test_config, 'r') as f:
     print(contents)
 print("-" * 60)
 
-# Step 2: Load config again (simulating second run)
-verify_script = """
-import sys
-sys.path.insert(0, '.')
-from mariadb_manager import MariaDBManager
+print("\n" + "=" * 60)
+print("SECOND RUN: Loading and verifying config")
+print("=" * 60)
+
+# A new process starts with no parsed configs; forget them so the
+# second instance reads the file from disk
+mariadb_manager._CONFIG_CACHE.clear()
 
-print("\\nLoading config (simulating second run)")
-manager = MariaDBManager('test_user_workflow.conf')
+print("\nLoading config (simulating second run)")
+manager = MariaDBManager(test_config)
 
-print("\\nValues loaded:")
+print("\nValues loaded:")
 print(f"  host: {manager.config['mysql']['host']}")
 print(f"  user: {manager.config['mysql']['user']}")
 print(f"  password: {manager.config['mysql']['password']}")
@@ -115,29 +101,17 @@ if manager.config['mysql']['password'] != 'modified_password':
     errors.append(f"password: expected 'modified_password', got '{manager.config['mysql']['password']}'")
 
 if errors:
-    print("\\n❌ VERIFICATION FAILED:")
+    print("\n❌ VERIFICATION FAILED:")
     for error in errors:
         print(f"  {error}")
-    sys.exit(1)
 else:
-    print("\\n✅ All values match!")
-"""
-
-with open('_test_verify.py', 'w') as f:
-    f.write(verify_script)
-
-print("\n" + "=" * 60)
-print("SECOND RUN: Loading and verifying config")
-print("=" * 60)
-result = subprocess.run([sys.executable, '_test_verify.py'], cwd=os.getcwd())
+    print("\n✅ All values match!")
 
 # Cleanup
-os.remove('_test_modify.py')
-os.remove('_test_verify.py')
 if os.path.exists(test_config):
     os.remove(test_config)
 
-if result.returncode == 0:
+if not errors:
     print("\n" + "=" * 60)
     print("✅ WORKFLOW TEST PASSED")
     print("=" * 60)
@@ -6,8 +6,10 @@ Test script to verify MariaDB Manager installation and configuration
 
 import os
 import sys
+import shutil
 import subprocess
 import configparser
+import concurrent.futures
 
 def print_header(text):
     print(f"\n{'='*60}")
@@ -35,13 +37,20 @@ def check_python_version():
 
 def check_command(cmd):
     """Check if a command exists"""
-    try:
-        subprocess.run(['which', cmd], capture_output=True, check=True)
+    if shutil.which(cmd):
         print_success(f"{cmd} is installed")
         return True
-    except:
-        print_error(f"{cmd} is not installed")
-        return False
+    print_error(f"{cmd} is not installed")
+    return False
+
+def check_compressor():
+    """Report which backup compressor is available"""
+    for cmd in ['zstd', 'pigz']:
+        if shutil.which(cmd):
+            print_success(f"Compressor: {cmd} is installed")
+            return True
+    print_warning("Neither zstd nor pigz is installed, backups use single-threaded gzip")
+    return False
 
 def check_file_exists(filepath, description):
     """Check if a file exists"""
@@ -52,12 +61,9 @@ def check_file_exists(filepath, description):
         print_error(f"{description} not found: {filepath}")
         return False
 
-def check_file_permissions(filepath, expected_mode):
-    """Check file permissions"""
-    if not os.path.exists(filepath):
-        return False
-    
-    mode = oct(os.stat(filepath).st_mode)[-3:]
+def check_file_permissions(filepath, st, expected_mode):
+    """Check file permissions using an already-taken os.stat() result"""
+    mode = oct(st.st_mode)[-3:]
     if mode == expected_mode:
         print_success(f"Correct permissions ({mode}) on {filepath}")
         return True
@@ -65,16 +71,19 @@ def check_file_permissions(filepath, expected_mode):
         print_warning(f"Insecure permissions ({mode}) on {filepath}, should be {expected_mode}")
         return False
 
-def check_config_file(config_file):
-    """Check configuration file"""
-    if not os.path.exists(config_file):
-        print_error(f"Config file not found: {config_file}")
-        return False
-    
+def read_config(config_file):
+    """Parse the configuration file once for all checks"""
     try:
         config = configparser.ConfigParser()
         config.read(config_file)
-        
+        return config
+    except Exception as e:
+        print_error(f"Error reading config: {e}")
+        return None
+
+def check_config_file(config):
+    """Check configuration file"""
+    try:
         # Check required sections
         required_sections = ['mysql', 'backup_paths', 'options']
         for section in required_sections:
@@ -111,25 +120,22 @@ def check_config_file(config_file):
         print_error(f"Error reading config: {e}")
         return False
 
-def test_mysql_connection(config_file):
+def test_mysql_connection(config):
     """Test MySQL connection"""
     try:
-        config = configparser.ConfigParser()
-        config.read(config_file)
-        
         cmd = [
             'mysql',
             f"--host={config['mysql']['host']}",
             f"--user={config['mysql']['user']}",
             f"--password={config['mysql']['password']}",
             f"--port={config['mysql']['port']}",
-            '-e', 'SELECT VERSION();'
+            '-N', '-B', '-e', 'SELECT VERSION();'
         ]
         
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
         
         if result.returncode == 0:
-            version = result.stdout.strip().split('\n')[1] if len(result.stdout.strip().split('\n')) > 1 else 'Unknown'
+            version = result.stdout.strip() or 'Unknown'
             print_success(f"MySQL connection successful - Version: {version}")
             return True
         else:
@@ -142,10 +148,19 @@ def test_mysql_connection(config_file):
 
 def check_disk_space(paths):
     """Check disk space for backup locations"""
-    for path in paths:
-        if os.path.exists(path):
+    def probe(path):
+        try:
+            return os.statvfs(path)
+        except OSError:
+            return None
+
+    # statvfs can block on network mounts; probe all paths at once
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+        results = list(pool.map(probe, paths))
+
+    for path, stat in zip(paths, results):
+        if stat is not None:
             try:
-                stat = os.statvfs(path)
                 free_gb = (stat.f_bavail * stat.f_frsize) / (1024**3)
                 total_gb = (stat.f_blocks * stat.f_frsize) / (1024**3)
                 percent_free = (free_gb / total_gb) * 100
@@ -175,10 +190,11 @@ def main():
     
     # Test 2: Required commands
     print_header("Test 2: Required Commands")
-    required_commands = ['mysql', 'mysqldump', 'gzip']
+    required_commands = ['mysql', 'mysqldump']
     for cmd in required_commands:
         if not check_command(cmd):
             all_tests_passed = False
+    check_compressor()
     
     # Test 3: Script files
     print_header("Test 3: Script Files")
@@ -193,26 +209,36 @@ def main():
     
     # Test 4: Configuration file
     print_header("Test 4: Configuration File")
-    config_locations = [
-        'mariadb_backup.conf',
-        '/etc/mariadb_backup.conf',
-        os.path.expanduser('~/.config/mariadb_backup.conf')
-    ]
+    # Same search order the manager uses; keep checking with the defaults
+    # when mariadb_manager.py is missing or fails to import
+    try:
+        from mariadb_manager import CONFIG_LOCATIONS as config_locations
+    except Exception:
+        config_locations = (
+            '/etc/mariadb_backup.conf',
+            os.path.expanduser('~/.config/mariadb_backup.conf'),
+            'mariadb_backup.conf',
+        )
     
     config_found = False
-    config_file = None
+    config = None
     for loc in config_locations:
-        if os.path.exists(loc):
-            config_file = loc
-            config_found = True
-            print_success(f"Config file found: {loc}")
-            
-            # Check permissions
-            check_file_permissions(loc, '600')
-            
-            # Check contents
-            check_config_file(loc)
-            break
+        # One stat per candidate serves both the existence and permission checks
+        try:
+            st = os.stat(loc)
+        except OSError:
+            continue
+        config_found = True
+        print_success(f"Config file found: {loc}")
+        
+        # Check permissions
+        check_file_permissions(loc, st, '600')
+        
+        # Check contents
+        config = read_config(loc)
+        if config is not None:
+            check_config_file(config)
+        break
     
     if not config_found:
         print_error("No configuration file found")
@@ -221,9 +247,9 @@ def main():
         all_tests_passed = False
     
     # Test 5: MySQL connection
-    if config_found and config_file:
+    if config is not None:
         print_header("Test 5: MySQL Connection")
-        if not test_mysql_connection(config_file):
+        if not test_mysql_connection(config):
             all_tests_passed = False
             print("\n  Troubleshooting tips:")
             print("  - Verify MySQL is running: systemctl status mariadb")
@@ -232,11 +258,8 @@ def main():
     
     # Test 6: Backup directories
     print_header("Test 6: Backup Directories")
-    if config_found and config_file:
+    if config is not None:
         try:
-            config = configparser.ConfigParser()
-            config.read(config_file)
-            
             backup_paths = []
             for backup_type in ['hourly', 'daily', 'monthly']:
                 path = config['backup_paths'].get(backup_type)
@@ -9,6 +9,19 @@ import configparser
 
 config_file = 'test_save_issue.conf'
 
+
+def write_config(config, path):
+    """Save like MariaDBManager.save_config: private temp file, fsync, rename"""
+    tmp_file = f"{path}.tmp.{os.getpid()}"
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        config.write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
 print("Simulating the config save issue...")
 print()
 
@@ -21,9 +34,7 @@ config.set('mysql', 'user', 'root')
 config.set('mysql', 'password', '')
 config.set('mysql', 'port', '3306')
 
-with open(config_file, 'w') as f:
-    config.write(f)
-os.chmod(config_file, 0o600)
+write_config(config, config_file)
 print(f"   Created: {config_file}")
 print()
 
@@ -45,9 +56,7 @@ print()
 
 # Step 4: Save the config (like choosing "Save and Exit")
 print("4. Saving config file...")
-with open(config_file, 'w') as f:
-    config2.write(f)
-os.chmod(config_file, 0o600)
+write_config(config2, config_file)
 print(f"   Saved to: {config_file}")
 print()
 